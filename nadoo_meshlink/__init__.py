@@ -1,5 +1,24 @@
 """NADOO MeshLink Package."""
+from nadoo_meshlink.ratelimit import (
+    RateLimit,
+    RateLimitExceeded,
+    RateLimitPolicy,
+    RateLimiter,
+)
+from nadoo_meshlink.rpc import RpcError
 from nadoo_meshlink.services.meshlink_service import MeshLinkService
+from nadoo_meshlink.subscriptions import Subscription, TopicFilter
+from nadoo_meshlink.sync_client import SyncMeshLinkClient
 
 __version__ = "0.1.0"
-__all__ = ["MeshLinkService"]
+__all__ = [
+    "MeshLinkService",
+    "RateLimit",
+    "RateLimitExceeded",
+    "RateLimitPolicy",
+    "RateLimiter",
+    "RpcError",
+    "Subscription",
+    "SyncMeshLinkClient",
+    "TopicFilter",
+]
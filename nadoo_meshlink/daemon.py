@@ -0,0 +1,108 @@
+"""NADOO MeshLink Shared Backend Daemon Module.
+
+In shared mode all processes of a user on one host talk to a single Go
+backend over IPC sockets instead of each starting their own node. The
+first process starts the backend detached from itself; every process,
+including the first, attaches with a lease it keeps renewing. The
+backend exits once the last lease is gone.
+"""
+import asyncio
+import os
+import platform
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Seconds a client stays attached without renewing its lease
+LEASE_SECONDS = 15.0
+
+
+def shared_mode_supported() -> bool:
+    """Check whether the platform supports a shared backend."""
+    return fcntl is not None and platform.system().lower() != "windows"
+
+
+def shared_path(suffix: str) -> Path:
+    """Get the per-user path of a shared backend file."""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return Path(runtime_dir) / f"nadoo-meshlink-{os.getuid()}.{suffix}"
+
+
+def shared_endpoints() -> Dict[str, str]:
+    """Get the IPC endpoints of the shared backend."""
+    return {
+        "command": f"ipc://{shared_path('command')}",
+        "events": f"ipc://{shared_path('events')}",
+    }
+
+
+def shared_backend_running() -> bool:
+    """Check whether a shared daemon is alive.
+
+    The daemon holds an exclusive lock on the ``.pid`` shared path for as
+    long as it runs, so this works however busy the daemon is.
+    """
+    try:
+        with open(shared_path("pid")) as pidfile:
+            try:
+                fcntl.flock(pidfile, fcntl.LOCK_SH | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return True
+            fcntl.flock(pidfile, fcntl.LOCK_UN)
+            return False
+    except FileNotFoundError:
+        return False
+
+
+def spawn_shared_backend(binary: Path) -> subprocess.Popen:
+    """Start the Go backend as a detached shared daemon.
+
+    The daemon logs to the ``.log`` shared path since it outlives the
+    process starting it.
+    """
+    endpoints = shared_endpoints()
+    env = os.environ.copy()
+    env.update(
+        {
+            "MESHLINK_SHARED": "1",
+            "MESHLINK_COMMAND_ENDPOINT": endpoints["command"],
+            "MESHLINK_EVENT_ENDPOINT": endpoints["events"],
+            "MESHLINK_PIDFILE": str(shared_path("pid")),
+        }
+    )
+    with open(shared_path("log"), "ab") as log:
+        return subprocess.Popen(
+            [str(binary)],
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+
+
+class SharedBackendLock:
+    """Host-wide lock serializing the attach-or-start decision."""
+
+    def __init__(self):
+        """Initialize SharedBackendLock."""
+        self._file: Optional[object] = None
+
+    async def __aenter__(self) -> "SharedBackendLock":
+        """Acquire the lock without blocking the event loop."""
+        self._file = open(shared_path("lock"), "w")
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, fcntl.flock, self._file, fcntl.LOCK_EX)
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        """Release the lock."""
+        fcntl.flock(self._file, fcntl.LOCK_UN)
+        self._file.close()
+        self._file = None
@@ -0,0 +1,140 @@
+"""NADOO MeshLink Latency Tracking Module."""
+import re
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional
+
+_DURATION_PART = re.compile(r"([0-9]*\.?[0-9]+)(ns|us|µs|ms|s|m|h)")
+_DURATION_UNITS = {
+    "ns": 1e-9,
+    "us": 1e-6,
+    "µs": 1e-6,
+    "ms": 1e-3,
+    "s": 1.0,
+    "m": 60.0,
+    "h": 3600.0,
+}
+
+
+def parse_duration(value: str) -> Optional[float]:
+    """Parse a Go duration string such as ``"1.5ms"`` into seconds."""
+    if not value:
+        return None
+    parts = _DURATION_PART.findall(value)
+    if not parts or "".join(n + u for n, u in parts) != value:
+        return None
+    return sum(float(number) * _DURATION_UNITS[unit] for number, unit in parts)
+
+
+class PeerLatency:
+    """Smoothed RTT and jitter estimate for a single peer.
+
+    Uses the exponentially weighted estimators from RFC 6298 and keeps a
+    small window of raw samples for percentile deadlines.
+    """
+
+    def __init__(self, alpha: float = 0.125, beta: float = 0.25, window: int = 32):
+        """Initialize PeerLatency."""
+        self.alpha = alpha
+        self.beta = beta
+        self.rtt: Optional[float] = None
+        self.jitter = 0.0
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.updated = 0.0
+        self.failures = 0
+
+    def record(self, rtt: float) -> None:
+        """Fold an RTT sample (seconds) into the estimate."""
+        if self.rtt is None:
+            self.rtt = rtt
+            self.jitter = rtt / 2
+        else:
+            self.jitter += self.beta * (abs(self.rtt - rtt) - self.jitter)
+            self.rtt += self.alpha * (rtt - self.rtt)
+        self.samples.append(rtt)
+        self.updated = time.monotonic()
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        """Note a failed probe."""
+        self.failures += 1
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        """Get the given percentile (0-1) of recent RTT samples."""
+        if not self.samples:
+            return self.rtt
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(percentile * len(ordered)))
+        return ordered[index]
+
+    @property
+    def score(self) -> float:
+        """Get a ranking score; lower is better."""
+        if self.rtt is None:
+            return float("inf")
+        # Penalize unstable and recently unreachable peers
+        return (self.rtt + 2 * self.jitter) * (1 + self.failures)
+
+    def as_dict(self) -> Dict[str, float]:
+        """Get the estimate as a plain dict."""
+        return {
+            "rtt": self.rtt,
+            "jitter": self.jitter,
+            "samples": len(self.samples),
+            "failures": self.failures,
+        }
+
+
+class LatencyTracker:
+    """Per-peer latency estimates used for nearest-peer selection."""
+
+    def __init__(self, window: int = 32):
+        """Initialize LatencyTracker."""
+        self._window = window
+        self._peers: Dict[str, PeerLatency] = {}
+
+    def _get(self, peer_id: str) -> PeerLatency:
+        """Get or create the estimate for a peer."""
+        estimate = self._peers.get(peer_id)
+        if estimate is None:
+            estimate = self._peers[peer_id] = PeerLatency(window=self._window)
+        return estimate
+
+    def record(self, peer_id: str, rtt: float) -> None:
+        """Record an RTT sample (seconds) for a peer."""
+        self._get(peer_id).record(rtt)
+
+    def record_failure(self, peer_id: str) -> None:
+        """Record a failed probe for a peer."""
+        self._get(peer_id).record_failure()
+
+    def seed(self, peer_id: str, rtt: float) -> None:
+        """Use a backend-reported latency for peers without own samples."""
+        if self._get(peer_id).rtt is None:
+            self.record(peer_id, rtt)
+
+    def retain(self, peer_ids: Iterable[str]) -> None:
+        """Drop estimates for peers that are no longer connected."""
+        keep = set(peer_ids)
+        for peer_id in list(self._peers):
+            if peer_id not in keep:
+                del self._peers[peer_id]
+
+    def get(self, peer_id: str) -> Optional[PeerLatency]:
+        """Get the estimate for a peer, if any."""
+        return self._peers.get(peer_id)
+
+    def nearest(self, k: int, peer_ids: Optional[Iterable[str]] = None) -> List[str]:
+        """Get up to ``k`` peers with a known RTT, best first."""
+        candidates = self._peers if peer_ids is None else peer_ids
+        ranked = [
+            (self._peers[peer_id].score, peer_id)
+            for peer_id in candidates
+            if peer_id in self._peers and self._peers[peer_id].rtt is not None
+        ]
+        ranked.sort()
+        return [peer_id for _, peer_id in ranked[:k]]
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Get all estimates as plain dicts."""
+        return {peer_id: est.as_dict() for peer_id, est in self._peers.items()}
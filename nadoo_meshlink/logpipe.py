@@ -0,0 +1,151 @@
+"""NADOO MeshLink Backend Log Pipeline Module.
+
+Go backend output is appended to a buffer as it arrives and processed in
+batches by a background task: lines are parsed (JSON or console format),
+filtered by level, rate limited below ERROR and only then formatted and
+logged. A bounded ring keeps the most recent raw lines for diagnostics.
+"""
+import asyncio
+import json
+import logging
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+
+from nadoo_meshlink.ratelimit import TokenBucket
+
+_LEVELS = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "warn": logging.WARNING,
+    "warning": logging.WARNING,
+    "error": logging.ERROR,
+    "dpanic": logging.CRITICAL,
+    "panic": logging.CRITICAL,
+    "fatal": logging.CRITICAL,
+}
+
+
+def parse_line(line: str, error: bool = False) -> Tuple[int, str]:
+    """Get the log level and message of a backend output line.
+
+    Understands JSON lines and the tab-separated console format of the Go
+    libp2p logger; other lines are INFO on stdout and ERROR on stderr.
+    """
+    if line.startswith("{"):
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        if isinstance(record, dict):
+            level = _LEVELS.get(str(record.get("level", "")).lower(), logging.INFO)
+            message = record.get("msg") or record.get("message") or line
+            name = record.get("logger")
+            return level, f"{name}: {message}" if name else str(message)
+
+    fields = line.split("\t", 3)
+    if len(fields) >= 3:
+        level = _LEVELS.get(fields[1].lower())
+        if level is not None:
+            return level, "\t".join(fields[2:])
+
+    return (logging.ERROR if error else logging.INFO), line
+
+
+class BackendLogPipeline:
+    """Batches, filters and rate limits Go backend log output."""
+
+    def __init__(
+        self,
+        target: logging.Logger,
+        level: int = logging.INFO,
+        lines_per_second: float = 50.0,
+        burst: float = 100.0,
+        history: int = 1000,
+        max_pending: int = 10000,
+        flush_interval: float = 0.25,
+    ):
+        """Initialize BackendLogPipeline.
+
+        Args:
+            target: Logger receiving the backend output
+            level: Minimum level passed on to the logger
+            lines_per_second: Sustained rate of lines below ERROR passed on
+            burst: Lines below ERROR passed on at once before rate limiting
+            history: Number of recent raw lines kept for diagnostics
+            max_pending: Unprocessed lines kept before dropping the oldest
+            flush_interval: Seconds between processing batches
+        """
+        self.target = target
+        self.level = level
+        self.flush_interval = flush_interval
+        self._bucket = TokenBucket(lines_per_second, burst)
+        self._pending: Deque[Tuple[bool, str]] = deque(maxlen=max_pending)
+        self._recent: Deque[str] = deque(maxlen=history)
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"lines": 0, "filtered": 0, "suppressed": 0, "dropped": 0}
+
+    def feed(self, line: str, error: bool = False) -> None:
+        """Queue one output line; cheap enough to call per line."""
+        if len(self._pending) == self._pending.maxlen:
+            self.stats["dropped"] += 1
+        self._pending.append((error, line))
+        self._recent.append(line)
+
+    def set_rate(
+        self, lines_per_second: Optional[float] = None, burst: Optional[float] = None
+    ) -> None:
+        """Change the rate limit; omitted values are kept."""
+        self._bucket = TokenBucket(
+            lines_per_second or self._bucket.rate, burst or self._bucket.capacity
+        )
+
+    def recent(self, count: Optional[int] = None) -> List[str]:
+        """Get the most recent raw lines, oldest first."""
+        lines = list(self._recent)
+        return lines if count is None else lines[-count:]
+
+    def flush(self) -> None:
+        """Process all queued lines."""
+        pending, self._pending = self._pending, deque(maxlen=self._pending.maxlen)
+        if not pending:
+            return
+
+        suppressed = 0
+        minimum = max(self.level, self.target.getEffectiveLevel())
+        for error, line in pending:
+            self.stats["lines"] += 1
+            level, message = parse_line(line, error)
+            if level < minimum:
+                self.stats["filtered"] += 1
+                continue
+            # Errors such as a Go panic are never suppressed, however
+            # much chatter came before them
+            if level < logging.ERROR:
+                if self._bucket.delay(1) > 0:
+                    suppressed += 1
+                    continue
+                self._bucket.consume(1)
+            self.target.log(level, "MeshLink Go: %s", message)
+
+        if suppressed:
+            self.stats["suppressed"] += suppressed
+            self.target.warning("MeshLink Go: suppressed %d log lines", suppressed)
+
+    def start(self) -> None:
+        """Start processing queued lines in the background."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop background processing after a final flush."""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self.flush()
+
+    async def _run(self) -> None:
+        """Flush queued lines once per interval."""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            self.flush()
@@ -0,0 +1,282 @@
+"""NADOO MeshLink Rate Limiting Module."""
+import asyncio
+import heapq
+import itertools
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class RateLimitPolicy(str, Enum):
+    """What to do with an operation that exceeds a rate limit."""
+
+    WAIT = "wait"
+    REJECT = "reject"
+    SHED = "shed"
+
+
+class RateLimitExceeded(RuntimeError):
+    """Raised when an operation is rejected or shed by a rate limit."""
+
+
+@dataclass
+class RateLimit:
+    """Rate limit for one scope (global, a topic or a peer).
+
+    Args:
+        messages_per_second: Allowed message rate, or None for unlimited
+        bytes_per_second: Allowed payload byte rate, or None for unlimited
+        burst: Bucket capacity expressed in seconds worth of the rate
+        policy: How operations over the limit are handled
+        max_pending: Maximum waiting operations before shedding (SHED only)
+    """
+
+    messages_per_second: Optional[float] = None
+    bytes_per_second: Optional[float] = None
+    burst: float = 1.0
+    policy: RateLimitPolicy = RateLimitPolicy.WAIT
+    max_pending: int = 64
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at a fixed rate."""
+
+    def __init__(self, rate: float, capacity: float, clock=time.monotonic):
+        """Initialize TokenBucket."""
+        if rate <= 0:
+            raise ValueError("Token bucket rate must be positive")
+        self.rate = float(rate)
+        self.capacity = max(float(capacity), 1e-9)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        """Add the tokens accumulated since the last update."""
+        now = self._clock()
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def delay(self, amount: float) -> float:
+        """Get seconds until ``amount`` tokens are available."""
+        self._refill()
+        # Requests larger than the bucket pass once the bucket is full
+        amount = min(float(amount), self.capacity)
+        if self._tokens >= amount:
+            return 0.0
+        return (amount - self._tokens) / self.rate
+
+    def consume(self, amount: float) -> None:
+        """Take ``amount`` tokens from the bucket.
+
+        The full amount is charged even beyond the capacity; the bucket
+        then runs into debt, which later requests wait out, so the
+        long-run rate holds for requests larger than the burst.
+        """
+        self._refill()
+        self._tokens -= float(amount)
+
+
+class _Rule:
+    """A configured rate limit together with its token buckets."""
+
+    def __init__(self, limit: RateLimit):
+        """Initialize _Rule."""
+        self.limit = limit
+        self.messages: Optional[TokenBucket] = None
+        self.bytes: Optional[TokenBucket] = None
+        if limit.messages_per_second:
+            self.messages = TokenBucket(
+                limit.messages_per_second,
+                limit.messages_per_second * limit.burst,
+            )
+        if limit.bytes_per_second:
+            self.bytes = TokenBucket(
+                limit.bytes_per_second,
+                limit.bytes_per_second * limit.burst,
+            )
+        self.pending: List[Tuple[int, int, "_Waiter"]] = []
+
+    def delay(self, size: int) -> float:
+        """Get seconds until one message of ``size`` bytes is allowed."""
+        delay = 0.0
+        if self.messages:
+            delay = max(delay, self.messages.delay(1))
+        if self.bytes:
+            delay = max(delay, self.bytes.delay(size))
+        return delay
+
+    def consume(self, size: int) -> None:
+        """Account for one message of ``size`` bytes."""
+        if self.messages:
+            self.messages.consume(1)
+        if self.bytes:
+            self.bytes.consume(size)
+
+
+class _Waiter:
+    """An operation waiting for tokens under the SHED policy."""
+
+    def __init__(self, priority: int):
+        """Initialize _Waiter."""
+        self.priority = priority
+        self.shed = False
+        self.event = asyncio.Event()
+
+
+class RateLimiter:
+    """Token-bucket rate limiter with global, per-topic and per-peer scopes."""
+
+    def __init__(self):
+        """Initialize RateLimiter."""
+        self._global: Optional[_Rule] = None
+        self._topics: Dict[str, _Rule] = {}
+        self._peers: Dict[str, _Rule] = {}
+        self._sequence = itertools.count()
+        self._stats = {
+            "allowed": 0,
+            "throttled": 0,
+            "rejected": 0,
+            "shed": 0,
+        }
+
+    def set_limit(
+        self,
+        limit: Optional[RateLimit],
+        topic: Optional[str] = None,
+        peer: Optional[str] = None,
+    ) -> None:
+        """Set or clear (``limit=None``) the limit for a scope.
+
+        Without ``topic`` or ``peer`` the global limit is configured.
+        """
+        if topic is not None and peer is not None:
+            raise ValueError("A rate limit applies to a topic or a peer, not both")
+
+        rule = _Rule(limit) if limit else None
+        if topic is not None:
+            self._set_rule(self._topics, topic, rule)
+        elif peer is not None:
+            self._set_rule(self._peers, peer, rule)
+        else:
+            self._global = rule
+
+    @staticmethod
+    def _set_rule(rules: Dict[str, _Rule], key: str, rule: Optional[_Rule]) -> None:
+        """Store or remove a rule in a scope mapping."""
+        if rule:
+            rules[key] = rule
+        else:
+            rules.pop(key, None)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Get counters for allowed and throttled operations."""
+        return dict(self._stats)
+
+    def _rules(self, topic: Optional[str], peer: Optional[str]) -> List[_Rule]:
+        """Collect the rules applying to an operation."""
+        rules = []
+        if self._global:
+            rules.append(self._global)
+        if topic is not None and topic in self._topics:
+            rules.append(self._topics[topic])
+        if peer is not None and peer in self._peers:
+            rules.append(self._peers[peer])
+        return rules
+
+    async def acquire(
+        self,
+        size: int = 0,
+        topic: Optional[str] = None,
+        peer: Optional[str] = None,
+        priority: int = 0,
+    ) -> None:
+        """Wait until an operation is allowed by every applicable limit.
+
+        Args:
+            size: Payload size in bytes
+            topic: Topic the message is published to
+            peer: Destination peer ID
+            priority: Higher values are kept longer under the SHED policy
+
+        Raises:
+            RateLimitExceeded: If the operation is rejected or shed
+        """
+        rules = self._rules(topic, peer)
+        throttled = False
+        waiter: Optional[_Waiter] = None
+        try:
+            while True:
+                blocked = [(rule, rule.delay(size)) for rule in rules]
+                blocked = [(rule, delay) for rule, delay in blocked if delay > 0]
+                if not blocked:
+                    for rule in rules:
+                        rule.consume(size)
+                    self._stats["allowed"] += 1
+                    if throttled:
+                        self._stats["throttled"] += 1
+                    return
+
+                policies = {rule.limit.policy for rule, _ in blocked}
+                if RateLimitPolicy.REJECT in policies:
+                    self._stats["rejected"] += 1
+                    raise RateLimitExceeded("Rate limit exceeded")
+
+                delay = max(delay for _, delay in blocked)
+                if RateLimitPolicy.SHED in policies and waiter is None:
+                    waiter = self._enqueue(
+                        [rule for rule, _ in blocked
+                         if rule.limit.policy == RateLimitPolicy.SHED],
+                        priority,
+                    )
+
+                throttled = True
+                if waiter is None:
+                    await asyncio.sleep(delay)
+                    continue
+
+                try:
+                    await asyncio.wait_for(waiter.event.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                if waiter.shed:
+                    raise RateLimitExceeded("Rate limit exceeded, operation shed")
+        finally:
+            if waiter is not None:
+                self._dequeue(waiter, rules)
+
+    def _enqueue(self, rules: Iterable[_Rule], priority: int) -> _Waiter:
+        """Register a waiting operation, shedding the lowest priority one.
+
+        Raises:
+            RateLimitExceeded: If the new operation is itself the one shed
+        """
+        rules = list(rules)
+        for rule in rules:
+            if len(rule.pending) >= rule.limit.max_pending:
+                if priority <= rule.pending[0][0]:
+                    self._stats["shed"] += 1
+                    raise RateLimitExceeded("Rate limit exceeded, operation shed")
+
+        waiter = _Waiter(priority)
+        for rule in rules:
+            if len(rule.pending) >= rule.limit.max_pending:
+                _, _, lowest = heapq.heappop(rule.pending)
+                lowest.shed = True
+                lowest.event.set()
+                self._stats["shed"] += 1
+            heapq.heappush(rule.pending, (priority, next(self._sequence), waiter))
+        return waiter
+
+    @staticmethod
+    def _dequeue(waiter: _Waiter, rules: Iterable[_Rule]) -> None:
+        """Remove a finished operation from the waiting queues."""
+        for rule in rules:
+            entries = [entry for entry in rule.pending if entry[2] is not waiter]
+            if len(entries) != len(rule.pending):
+                heapq.heapify(entries)
+                rule.pending = entries
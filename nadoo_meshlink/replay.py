@@ -0,0 +1,75 @@
+"""NADOO MeshLink Trace Replay Command.
+
+Usage::
+
+    python -m nadoo_meshlink.replay trace.mltr --speed 2
+    python -m nadoo_meshlink.replay trace.mltr --speed 0 --stub
+"""
+import argparse
+import asyncio
+import json
+from typing import Any, Dict
+
+from nadoo_meshlink.trace import StubBackend, TraceReplayer
+
+
+async def _run_replay(args: argparse.Namespace) -> Dict[str, Any]:
+    """Replay a trace as configured on the command line."""
+    stub_task = None
+    endpoint = args.endpoint
+    if args.stub:
+        stub = StubBackend(endpoint.replace("localhost", "127.0.0.1"), args.stub_latency)
+        stub_task = asyncio.create_task(stub.serve())
+    try:
+        replayer = TraceReplayer(
+            args.trace,
+            endpoint,
+            args.concurrency,
+            args.timeout,
+            session_commands=args.stub or args.session_commands,
+        )
+        report = await replayer.replay(None if args.speed <= 0 else args.speed)
+    finally:
+        if stub_task:
+            stub_task.cancel()
+            await asyncio.gather(stub_task, return_exceptions=True)
+    return {
+        "duration": report.duration,
+        "max_lag": report.lag,
+        "errors": report.errors,
+        "timeouts": report.timeouts,
+        "skipped": report.skipped,
+        "latency": report.summary(),
+    }
+
+
+def main() -> None:
+    """Replay a trace file and print latency statistics as JSON."""
+    parser = argparse.ArgumentParser(description="Replay a MeshLink bridge trace")
+    parser.add_argument("trace", help="Trace file recorded by MeshLinkService")
+    parser.add_argument("--endpoint", default="tcp://localhost:5555")
+    parser.add_argument(
+        "--speed", type=float, default=1.0, help="Time scale, 0 for maximum speed"
+    )
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument(
+        "--timeout", type=float, default=5.0, help="Seconds to wait for each response"
+    )
+    parser.add_argument(
+        "--stub", action="store_true", help="Replay against a local stand-in backend"
+    )
+    parser.add_argument("--stub-latency", type=float, default=0.0)
+    parser.add_argument(
+        "--session-commands",
+        action="store_true",
+        help="Also replay attach, serve, set_filter, respond and detach "
+        "against a real backend (always on with --stub)",
+    )
+    args = parser.parse_args()
+
+    summary = asyncio.run(_run_replay(args))
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""NADOO MeshLink Peer-to-Peer Request/Response Module."""
+import asyncio
+import inspect
+import uuid
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Tuple, Union
+
+# A handler receives (peer_id, payload) and either returns a single
+# response or is an async generator yielding streamed responses.
+RequestHandler = Callable[[str, Any], Union[Awaitable[Any], AsyncIterator[Any]]]
+
+
+class RpcError(RuntimeError):
+    """Raised when a peer request fails remotely or in transit."""
+
+
+class PendingRequests:
+    """Correlates response frames with in-flight requests by ID."""
+
+    def __init__(self):
+        """Initialize PendingRequests."""
+        self._pending: Dict[str, asyncio.Queue] = {}
+
+    def open(self) -> Tuple[str, asyncio.Queue]:
+        """Register a new request and get its ID and frame queue."""
+        request_id = uuid.uuid4().hex
+        frames: asyncio.Queue = asyncio.Queue()
+        self._pending[request_id] = frames
+        return request_id, frames
+
+    def close(self, request_id: str) -> None:
+        """Forget a finished or abandoned request."""
+        self._pending.pop(request_id, None)
+
+    def deliver(self, frame: Dict[str, Any]) -> bool:
+        """Route a response frame to its request; False if none is waiting."""
+        frames = self._pending.get(frame.get("id"))
+        if frames is None:
+            return False
+        frames.put_nowait(frame)
+        return True
+
+    def __len__(self) -> int:
+        """Get the number of in-flight requests."""
+        return len(self._pending)
+
+
+async def iter_handler(handler: RequestHandler, peer_id: str, payload: Any) -> AsyncIterator[Any]:
+    """Run a request handler and iterate over the responses it produces."""
+    result = handler(peer_id, payload)
+    if inspect.isasyncgen(result):
+        async for item in result:
+            yield item
+        return
+    if inspect.isawaitable(result):
+        result = await result
+    yield result
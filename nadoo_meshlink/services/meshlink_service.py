@@ -4,28 +4,97 @@ import json
 import logging
 import os
 import platform
+import time
+import uuid
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Set,
+    TypeVar,
+)
 
 import zmq
 import zmq.asyncio
 from nadoo_framework import Service, ProcessManager
 
+from nadoo_meshlink.daemon import (
+    LEASE_SECONDS,
+    SharedBackendLock,
+    shared_backend_running,
+    shared_endpoints,
+    shared_mode_supported,
+    spawn_shared_backend,
+)
+from nadoo_meshlink.latency import LatencyTracker, parse_duration
+from nadoo_meshlink.logpipe import BackendLogPipeline
+from nadoo_meshlink.ratelimit import RateLimit, RateLimiter
+from nadoo_meshlink.rpc import PendingRequests, RequestHandler, RpcError, iter_handler
+from nadoo_meshlink.subscriptions import (
+    MessageCallback,
+    Subscription,
+    TopicFilter,
+    event_prefixes,
+)
+from nadoo_meshlink.timeseries import StatsSampler
+from nadoo_meshlink.trace import TraceRecorder
+
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+SAMPLED_FIELDS = (
+    "connected_peers",
+    "bandwidth",
+    "latency_min",
+    "latency_mean",
+    "latency_max",
+)
+
 
 class MeshLinkService(Service):
     """MeshLink P2P Networking Service."""
 
-    def __init__(self):
-        """Initialize MeshLinkService."""
+    def __init__(self, shared: Optional[bool] = None):
+        """Initialize MeshLinkService.
+
+        Args:
+            shared: Attach to a per-host backend shared by all processes
+                instead of starting a private one; defaults to the
+                MESHLINK_SHARED environment variable
+        """
         super().__init__()
         self.name = "meshlink"
         self.description = "NADOO MeshLink P2P Networking Service"
+        if shared is None:
+            shared = os.environ.get("MESHLINK_SHARED") == "1"
+        self._shared = shared
+        self._client_id = uuid.uuid4().hex
+        self._lease_task: Optional[asyncio.Task] = None
         self._process_id: Optional[str] = None
         self._zmq_context: Optional[zmq.asyncio.Context] = None
+        self._command_endpoint = "tcp://localhost:5555"
         self._socket: Optional[zmq.asyncio.Socket] = None
+        self._events: Optional[zmq.asyncio.Socket] = None
+        self._events_task: Optional[asyncio.Task] = None
         self._running = False
+        self._command_lock: Optional[asyncio.Lock] = None
+        self._rate_limiter = RateLimiter()
+        self._latency = LatencyTracker()
+        self._latency_task: Optional[asyncio.Task] = None
+        self._pending_requests = PendingRequests()
+        self._request_handler: Optional[RequestHandler] = None
+        self._handler_tasks: Set[asyncio.Task] = set()
+        self._subscriptions: Dict[str, List[Subscription]] = {}
+        self._joined_topics: Set[str] = set()
+        self._trace: Optional[TraceRecorder] = None
+        self._sampler: Optional[StatsSampler] = None
+        self._backend_logs = BackendLogPipeline(logger)
 
     @property
     def go_binary_path(self) -> Path:
@@ -49,101 +118,455 @@ class MeshLinkService(Service):
             return
 
         try:
-            # Get ProcessManager
-            process_manager = self.framework.get_service("process_manager")
-            if not process_manager:
-                raise RuntimeError("ProcessManager service not found")
-
-            # Make binary executable on Unix systems
-            if platform.system().lower() != "windows":
-                self.go_binary_path.chmod(0o755)
-
-            # Start the Go process through ProcessManager
-            self._process_id = await process_manager.start_process(
-                command=str(self.go_binary_path),
-                name="meshlink_go",
-                restart_on_failure=True,
-                stdout_callback=self._handle_process_output,
-                stderr_callback=self._handle_process_error
-            )
-
-            # Initialize ZMQ connection
-            await self._init_zmq()
+            self._backend_logs.start()
+            if self._shared:
+                await self._attach_shared_backend()
+            else:
+                await self._start_backend()
+            self._events_task = asyncio.create_task(self._listen_events())
             self._running = True
             logger.info("MeshLink service started successfully")
         except Exception as e:
             logger.error(f"Failed to start MeshLink service: {e}")
-            await self.stop()
+            # Release whatever was set up before the failure
+            await self._shutdown()
             raise
 
+    async def _start_backend(self) -> None:
+        """Start a private Go process for this service."""
+        # Get ProcessManager
+        process_manager = self.framework.get_service("process_manager")
+        if not process_manager:
+            raise RuntimeError("ProcessManager service not found")
+
+        # Make binary executable on Unix systems
+        if platform.system().lower() != "windows":
+            self.go_binary_path.chmod(0o755)
+
+        # Start the Go process through ProcessManager
+        self._process_id = await process_manager.start_process(
+            command=str(self.go_binary_path),
+            name="meshlink_go",
+            restart_on_failure=True,
+            stdout_callback=self._handle_process_output,
+            stderr_callback=self._handle_process_error
+        )
+
+        # Initialize ZMQ connection
+        await self._init_zmq()
+
+    async def _attach_shared_backend(self, timeout: float = 10.0) -> None:
+        """Attach to the per-host backend, starting it if nobody has yet."""
+        if not shared_mode_supported():
+            raise RuntimeError("Shared backend mode is not supported on this platform")
+
+        endpoints = shared_endpoints()
+        await self._init_zmq(endpoints["command"], endpoints["events"])
+        await self._attach_or_spawn(timeout)
+
+        self._lease_task = asyncio.create_task(self._renew_lease())
+        logger.info(f"Attached to shared MeshLink backend as {self._client_id}")
+
+    async def _attach_or_spawn(self, timeout: float) -> None:
+        """Attach to the shared daemon, spawning it if none is running."""
+        # Only one process may decide to start the daemon. A running
+        # daemon holds its pidfile lock, so a daemon that is merely busy
+        # is never mistaken for a missing one.
+        async with SharedBackendLock():
+            if not shared_backend_running():
+                if platform.system().lower() != "windows":
+                    self.go_binary_path.chmod(0o755)
+                spawn_shared_backend(self.go_binary_path)
+                logger.info("Started shared MeshLink backend")
+
+            # The request is queued until a starting daemon has bound its
+            # socket, so a single attempt also covers the startup
+            if not await self._try_attach(timeout):
+                raise RuntimeError("Shared MeshLink backend did not answer")
+
+    async def _try_attach(self, timeout: float) -> bool:
+        """Attach or renew the lease; False if the backend does not answer."""
+        try:
+            await self._send_command(
+                "attach", reply_timeout=timeout, lease=LEASE_SECONDS
+            )
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def _renew_lease(self) -> None:
+        """Keep this client attached to the shared backend.
+
+        After a failed renewal the daemon may have died or dropped this
+        client, so the client attaches again, respawning the daemon if
+        needed, and re-registers its state.
+        """
+        while True:
+            await asyncio.sleep(LEASE_SECONDS / 3)
+            try:
+                if await self._try_attach(LEASE_SECONDS / 3):
+                    continue
+                logger.warning("Shared MeshLink backend did not renew the lease")
+                await self._attach_or_spawn(LEASE_SECONDS)
+                await self._restore_backend_state()
+                logger.info("Reattached to shared MeshLink backend")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Shared MeshLink lease renewal failed: {e}")
+
+    async def _restore_backend_state(self) -> None:
+        """Register joined topics, filters and the request handler again."""
+        for topic in list(self._joined_topics):
+            await self._send_command("join", topic=topic)
+        for topic in list(self._subscriptions):
+            await self._install_header_filters(topic)
+        if self._request_handler is not None:
+            await self._send_command("serve", enabled=True)
+
     async def stop(self) -> None:
         """Stop the MeshLink service."""
         if not self._running:
             return
 
         try:
-            # Stop the Go process through ProcessManager
-            if self._process_id:
-                process_manager = self.framework.get_service("process_manager")
-                if process_manager:
-                    await process_manager.stop_process(self._process_id)
-                self._process_id = None
-
-            # Cleanup ZMQ
-            if self._socket:
-                self._socket.close()
-            if self._zmq_context:
-                self._zmq_context.term()
-
-            self._running = False
+            await self._shutdown()
             logger.info("MeshLink service stopped successfully")
         except Exception as e:
             logger.error(f"Error stopping MeshLink service: {e}")
             raise
 
-    async def _init_zmq(self) -> None:
+    async def _shutdown(self) -> None:
+        """Stop background tasks, the Go process and ZeroMQ."""
+        await self.stop_latency_probe()
+        await self.stop_stats_sampler()
+        await self._cancel_background_tasks()
+
+        # Detach from a shared backend, which exits after its last client
+        if self._lease_task:
+            self._lease_task.cancel()
+            await asyncio.gather(self._lease_task, return_exceptions=True)
+            self._lease_task = None
+            try:
+                await self._send_command("detach", reply_timeout=1.0)
+            except (asyncio.TimeoutError, RuntimeError) as e:
+                logger.warning(f"Could not detach from shared MeshLink backend: {e}")
+
+        # Stop the Go process through ProcessManager
+        if self._process_id:
+            process_manager = self.framework.get_service("process_manager")
+            if process_manager:
+                await process_manager.stop_process(self._process_id)
+            self._process_id = None
+
+        # Cleanup ZMQ
+        if self._socket:
+            self._socket.close(linger=0)
+            self._socket = None
+        if self._events:
+            self._events.close(linger=0)
+            self._events = None
+        if self._zmq_context:
+            self._zmq_context.term()
+            self._zmq_context = None
+
+        self.stop_trace()
+        await self._backend_logs.stop()
+        self._running = False
+
+    async def _init_zmq(
+        self,
+        command_endpoint: str = "tcp://localhost:5555",
+        event_endpoint: str = "tcp://localhost:5556",
+    ) -> None:
         """Initialize ZeroMQ connection."""
         self._zmq_context = zmq.asyncio.Context()
+        self._command_endpoint = command_endpoint
+        self._socket = self._zmq_context.socket(zmq.REQ)
+        self._socket.connect(command_endpoint)
+        self._command_lock = asyncio.Lock()
+
+        # Events pushed by the Go service, e.g. RPC requests and responses.
+        # RPC events are addressed to a client so a shared backend can
+        # route them to the process that sent the request or serves them.
+        self._events = self._zmq_context.socket(zmq.SUB)
+        self._events.connect(event_endpoint)
+        for kind in ("rpc/response/", "rpc/request/"):
+            self._events.setsockopt(zmq.SUBSCRIBE, f"{kind}{self._client_id}".encode())
+
+    def _reset_command_socket(self) -> None:
+        """Replace the command socket after a request went unanswered."""
+        self._socket.close(linger=0)
         self._socket = self._zmq_context.socket(zmq.REQ)
-        self._socket.connect("tcp://localhost:5555")
+        self._socket.connect(self._command_endpoint)
+
+    async def _cancel_background_tasks(self) -> None:
+        """Cancel the event listener and running request handlers."""
+        tasks = list(self._handler_tasks)
+        if self._events_task:
+            tasks.append(self._events_task)
+            self._events_task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._handler_tasks.clear()
+
+    async def _listen_events(self) -> None:
+        """Receive and dispatch events from the Go service."""
+        while True:
+            kind, body = await self._events.recv_multipart()
+            try:
+                event = json.loads(body)
+            except ValueError:
+                logger.warning(f"Malformed MeshLink event on {kind!r}")
+                continue
+            self._dispatch_event(kind.decode(), event)
+
+    def _dispatch_event(self, kind: str, event: Dict[str, Any]) -> None:
+        """Route a single event to its consumer."""
+        if kind.startswith("rpc/response/"):
+            self._pending_requests.deliver(event)
+        elif kind.startswith("rpc/request/"):
+            self._spawn(self._handle_request(event))
+        elif kind.startswith("msg/"):
+            self._deliver_topic_message(event)
+
+    def _spawn(self, coro: Awaitable[Any]) -> None:
+        """Run a coroutine as a task that is cancelled on stop."""
+        task = asyncio.ensure_future(coro)
+        self._handler_tasks.add(task)
+        task.add_done_callback(self._handler_tasks.discard)
+
+    def _deliver_topic_message(self, message: Dict[str, Any]) -> None:
+        """Pass a topic message to every subscription whose filter matches."""
+        for subscription in list(self._subscriptions.get(message.get("topic"), [])):
+            if not subscription.matches(message):
+                continue
+            try:
+                pending = subscription.deliver(message)
+            except Exception as e:
+                logger.error(
+                    f"Error in subscription callback for {subscription.topic}: {e}"
+                )
+                continue
+            if pending is not None:
+                self._spawn(pending)
 
     async def _handle_process_output(self, line: str) -> None:
         """Handle process stdout."""
-        logger.info(f"MeshLink Go: {line}")
+        self._backend_logs.feed(line)
 
     async def _handle_process_error(self, line: str) -> None:
         """Handle process stderr."""
-        logger.error(f"MeshLink Go Error: {line}")
+        self._backend_logs.feed(line, error=True)
+
+    def recent_backend_logs(self, count: Optional[int] = None) -> List[str]:
+        """Get the most recent raw output lines of the Go process."""
+        return self._backend_logs.recent(count)
 
-    async def _send_command(self, command: str, **kwargs) -> Dict[str, Any]:
-        """Send command to Go service."""
+    def configure_backend_logs(
+        self,
+        level: Optional[int] = None,
+        lines_per_second: Optional[float] = None,
+        burst: Optional[float] = None,
+    ) -> None:
+        """Change the level filter and rate limit for Go process output."""
+        if level is not None:
+            self._backend_logs.level = level
+        if lines_per_second is not None or burst is not None:
+            self._backend_logs.set_rate(lines_per_second, burst)
+
+    async def _send_command(
+        self, command: str, reply_timeout: Optional[float] = None, **kwargs
+    ) -> Dict[str, Any]:
+        """Send command to Go service.
+
+        ``reply_timeout`` bounds the wait for the reply once the command
+        has been sent, not the wait for commands queued ahead of it.
+
+        Raises:
+            RuntimeError: If the Go service reports an error
+            asyncio.TimeoutError: If no reply arrives within reply_timeout
+        """
         if not self._socket:
             raise RuntimeError("ZeroMQ socket not initialized")
 
-        message = {"command": command, **kwargs}
-        await self._socket.send_json(message)
-        response = await self._socket.recv_json()
+        # A REQ socket only allows one outstanding request at a time
+        message = {"command": command, "client": self._client_id, **kwargs}
+        request = json.dumps(message).encode()
+        async with self._command_lock:
+            started = time.monotonic()
+            try:
+                await self._socket.send(request)
+                if reply_timeout is not None and not await self._socket.poll(
+                    reply_timeout * 1000, zmq.POLLIN
+                ):
+                    raise asyncio.TimeoutError(f"No reply to {command}")
+                reply = await self._socket.recv()
+            except (asyncio.CancelledError, asyncio.TimeoutError):
+                # A REQ socket cannot send again before the reply has
+                # arrived, so an abandoned exchange needs a fresh socket
+                self._reset_command_socket()
+                raise
+            latency = time.monotonic() - started
+
+        response = json.loads(reply)
+        if self._trace:
+            self._trace.record(
+                started, latency, command, request, len(reply), not response.get("error")
+            )
 
         if response.get("error"):
             raise RuntimeError(response["error"])
 
         return response
 
+    def start_trace(self, path: str, payloads: bool = True) -> None:
+        """Record every bridge command and response to a trace file.
+
+        Replay the file with ``python -m nadoo_meshlink.replay``.
+        """
+        self.stop_trace()
+        self._trace = TraceRecorder(path, payloads=payloads)
+        logger.info(f"Recording MeshLink bridge trace to {path}")
+
+    def stop_trace(self) -> None:
+        """Stop recording and close the trace file."""
+        if self._trace:
+            self._trace.close()
+            logger.info(f"Recorded {self._trace.count} commands to {self._trace.path}")
+            self._trace = None
+
     async def connect(self, address: str) -> Dict[str, Any]:
         """Connect to a peer."""
         return await self._send_command("connect", address=address)
 
-    async def broadcast(self, message: str) -> Dict[str, Any]:
+    def set_rate_limit(
+        self,
+        limit: Optional[RateLimit],
+        topic: Optional[str] = None,
+        peer: Optional[str] = None,
+    ) -> None:
+        """Set or clear the rate limit for a topic, a peer or globally."""
+        self._rate_limiter.set_limit(limit, topic=topic, peer=peer)
+
+    @property
+    def rate_limit_stats(self) -> Dict[str, int]:
+        """Get counters for allowed, throttled, rejected and shed operations."""
+        return self._rate_limiter.stats
+
+    async def broadcast(self, message: str, priority: int = 0) -> Dict[str, Any]:
         """Broadcast a message to all peers."""
+        await self._rate_limiter.acquire(
+            size=len(message.encode()), priority=priority
+        )
         return await self._send_command("broadcast", message=message)
 
     async def join_topic(self, topic: str) -> Dict[str, Any]:
         """Join a topic."""
-        return await self._send_command("join", topic=topic)
+        response = await self._send_command("join", topic=topic)
+        self._joined_topics.add(topic)
+        return response
+
+    async def publish_to_topic(
+        self,
+        topic: str,
+        message: str,
+        priority: int = 0,
+        key: str = "",
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        """Publish a message to a topic.
+
+        ``key`` and ``headers`` travel with the message so subscribers can
+        filter on them without receiving the message itself.
+        """
+        await self._rate_limiter.acquire(
+            size=len(message.encode()), topic=topic, priority=priority
+        )
+        return await self._send_command(
+            "publish", topic=topic, message=message, key=key, headers=headers or {}
+        )
+
+    async def subscribe(
+        self,
+        topic: str,
+        callback: MessageCallback,
+        filter: Optional[TopicFilter] = None,
+    ) -> Subscription:
+        """Subscribe a callback to the messages of a topic.
+
+        Key prefixes become ZMQ subscriptions, which are applied on the
+        publishing side, and header filters are installed in the Go
+        service, so non-matching messages never reach Python.
+
+        Args:
+            topic: Topic name
+            callback: Called with each message dict; may be a coroutine
+            filter: Optional key prefix and header filter
+
+        Returns:
+            Subscription: Handle to change the filter or unsubscribe
+        """
+        if not self._events:
+            raise RuntimeError("ZeroMQ socket not initialized")
+
+        await self.join_topic(topic)
+        subscription = Subscription(self, topic, callback, filter)
+        self._subscriptions.setdefault(topic, []).append(subscription)
+        for prefix in event_prefixes(topic, filter):
+            self._events.setsockopt(zmq.SUBSCRIBE, prefix)
+        await self._install_header_filters(topic)
+        return subscription
+
+    async def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a subscription created by subscribe()."""
+        subscriptions = self._subscriptions.get(subscription.topic, [])
+        if not subscription.active or subscription not in subscriptions:
+            return
 
-    async def publish_to_topic(self, topic: str, message: str) -> Dict[str, Any]:
-        """Publish a message to a topic."""
-        return await self._send_command("publish", topic=topic, message=message)
+        subscription.active = False
+        subscriptions.remove(subscription)
+        if not subscriptions:
+            del self._subscriptions[subscription.topic]
+        if self._events:
+            for prefix in event_prefixes(subscription.topic, subscription.filter):
+                self._events.setsockopt(zmq.UNSUBSCRIBE, prefix)
+        await self._install_header_filters(subscription.topic)
+
+    async def _update_subscription(
+        self, subscription: Subscription, topic_filter: Optional[TopicFilter]
+    ) -> None:
+        """Swap the filter of a live subscription."""
+        if not subscription.active:
+            raise RuntimeError("Subscription is no longer active")
+
+        # Subscribe to the new prefixes first so no matching message is lost
+        old_prefixes = event_prefixes(subscription.topic, subscription.filter)
+        for prefix in event_prefixes(subscription.topic, topic_filter):
+            self._events.setsockopt(zmq.SUBSCRIBE, prefix)
+        for prefix in old_prefixes:
+            self._events.setsockopt(zmq.UNSUBSCRIBE, prefix)
+
+        subscription.filter = topic_filter
+        await self._install_header_filters(subscription.topic)
+
+    async def _install_header_filters(self, topic: str) -> None:
+        """Push the union of a topic's header filters to the Go service."""
+        subscriptions = self._subscriptions.get(topic)
+        if not subscriptions:
+            # No filter at all tells the Go service this client is gone
+            await self._send_command("set_filter", topic=topic, headers=None)
+            return
+
+        headers = []
+        for subscription in subscriptions:
+            if subscription.filter is None or not subscription.filter.headers:
+                # One unfiltered subscription needs every message
+                headers = []
+                break
+            headers.append(subscription.filter.headers)
+        await self._send_command("set_filter", topic=topic, headers=headers)
 
     async def get_node_address(self) -> str:
         """Get the node's address."""
@@ -153,8 +576,335 @@ class MeshLinkService(Service):
     async def get_peers(self) -> List[str]:
         """Get list of connected peers."""
         response = await self._send_command("peers")
-        return response["peers"]
+        return response.get("peers") or []
 
     async def get_network_stats(self) -> Dict[str, Any]:
         """Get network statistics."""
-        return await self._send_command("stats")
+        response = await self._send_command("stats")
+        return response.get("data") or {}
+
+    async def ping_peer(self, peer_id: str, timeout: float = 10.0) -> float:
+        """Measure the round-trip time to a peer in seconds.
+
+        The Go service pings in the background and reports the RTT as an
+        event, so slow peers do not block other bridge commands.
+        """
+        request_id, frames = self._pending_requests.open()
+        try:
+            await self._send_command("ping", peer_id=peer_id, id=request_id)
+            frame = await asyncio.wait_for(frames.get(), timeout)
+            if frame.get("error"):
+                raise RpcError(frame["error"])
+        except (RuntimeError, asyncio.TimeoutError):
+            self._latency.record_failure(peer_id)
+            raise
+        finally:
+            self._pending_requests.close(request_id)
+
+        rtt = float(frame["data"])
+        self._latency.record(peer_id, rtt)
+        return rtt
+
+    async def start_latency_probe(self, interval: float = 5.0) -> None:
+        """Start pinging connected peers periodically to estimate RTT."""
+        if self._latency_task and not self._latency_task.done():
+            return
+        self._latency_task = asyncio.create_task(self._latency_probe(interval))
+
+    async def stop_latency_probe(self) -> None:
+        """Stop the periodic latency probe."""
+        if not self._latency_task:
+            return
+        self._latency_task.cancel()
+        try:
+            await self._latency_task
+        except asyncio.CancelledError:
+            pass
+        self._latency_task = None
+
+    async def _latency_probe(self, interval: float) -> None:
+        """Ping every connected peer once per interval."""
+        while True:
+            try:
+                await self.refresh_latencies()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"MeshLink latency probe failed: {e}")
+            await asyncio.sleep(interval)
+
+    async def refresh_latencies(self) -> None:
+        """Ping all connected peers once and update their RTT estimates."""
+        peer_ids = []
+        for peer in await self.get_peers():
+            if isinstance(peer, dict):
+                peer_id = peer.get("id")
+                reported = parse_duration(peer.get("latency") or "")
+                if peer_id and reported is not None:
+                    self._latency.seed(peer_id, reported)
+            else:
+                peer_id = peer
+            if peer_id:
+                peer_ids.append(peer_id)
+
+        self._latency.retain(peer_ids)
+        results = await asyncio.gather(
+            *(self.ping_peer(peer_id) for peer_id in peer_ids), return_exceptions=True
+        )
+        for peer_id, result in zip(peer_ids, results):
+            if isinstance(result, (RuntimeError, asyncio.TimeoutError)):
+                logger.debug(f"Ping to {peer_id} failed: {result}")
+            elif isinstance(result, BaseException):
+                raise result
+
+    def nearest_peers(self, k: int = 1) -> List[str]:
+        """Get the ``k`` peers with the lowest estimated latency."""
+        return self._latency.nearest(k)
+
+    @property
+    def peer_latencies(self) -> Dict[str, Dict[str, float]]:
+        """Get the RTT and jitter estimates (seconds) for all peers."""
+        return self._latency.snapshot()
+
+    async def send_to_best_peer(
+        self,
+        operation: Callable[[str], Awaitable[T]],
+        peers: Optional[List[str]] = None,
+        percentile: float = 0.95,
+        min_hedge_delay: float = 0.01,
+    ) -> T:
+        """Run an operation against the fastest peer, hedging on the runner-up.
+
+        If the best peer has not answered within its ``percentile`` RTT,
+        the same operation is fired at the next-best peer and whichever
+        finishes first successfully wins; the other one is cancelled.
+
+        Args:
+            operation: Coroutine function taking the target peer ID
+            peers: Candidate peer IDs, defaults to all peers with RTT data
+            percentile: RTT percentile (0-1) used as the hedge deadline
+            min_hedge_delay: Lower bound for the hedge deadline in seconds
+
+        Returns:
+            T: Result of the first successful operation
+
+        Raises:
+            RuntimeError: If no peer with latency data is available
+        """
+        candidates = self._latency.nearest(2, peers)
+        if not candidates:
+            raise RuntimeError("No peers with latency data available")
+
+        primary = asyncio.ensure_future(operation(candidates[0]))
+        tasks = {primary}
+        try:
+            if len(candidates) == 1:
+                return await primary
+
+            deadline = self._latency.get(candidates[0]).percentile(percentile)
+            done, _ = await asyncio.wait(
+                {primary}, timeout=max(deadline, min_hedge_delay)
+            )
+            if done and not primary.exception():
+                return primary.result()
+
+            hedge = asyncio.ensure_future(operation(candidates[1]))
+            tasks.add(hedge)
+            pending = tasks - done
+            error: Optional[BaseException] = primary.exception() if done else None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # Also reached when the caller is cancelled while waiting
+            for task in tasks:
+                task.cancel()
+
+    async def serve(self, handler: Optional[RequestHandler]) -> None:
+        """Register the handler answering requests from other peers.
+
+        The handler is called as ``handler(peer_id, payload)`` and either
+        returns a single response or is an async generator streaming
+        several responses. Pass ``None`` to stop serving. With a shared
+        backend, incoming requests rotate between all serving processes.
+        """
+        self._request_handler = handler
+        await self._send_command("serve", enabled=handler is not None)
+
+    async def _handle_request(self, event: Dict[str, Any]) -> None:
+        """Answer an incoming request through the registered handler."""
+        request_id = event.get("id")
+        timeout = event.get("timeout_ms", 0) / 1000 or None
+        try:
+            if self._request_handler is None:
+                raise RpcError("No request handler registered")
+            await self._stream_responses(
+                request_id, event.get("peer"), event.get("data"), timeout
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            try:
+                await self._send_command(
+                    "respond",
+                    id=request_id,
+                    done=True,
+                    error=str(e) or type(e).__name__,
+                )
+            except RuntimeError:
+                # The request has expired on the Go side already
+                pass
+
+    async def _stream_responses(
+        self, request_id: str, peer_id: str, payload: Any, timeout: Optional[float]
+    ) -> None:
+        """Send each handler item as a response frame, then a final done frame.
+
+        The deadline only bounds waiting for the handler, never a respond
+        command already on its way over the bridge.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout else None
+        items = iter_handler(self._request_handler, peer_id, payload)
+        try:
+            while True:
+                remaining = None if deadline is None else deadline - loop.time()
+                if remaining is not None and remaining <= 0:
+                    raise asyncio.TimeoutError("Request handler timed out")
+                try:
+                    item = await asyncio.wait_for(items.__anext__(), remaining)
+                except StopAsyncIteration:
+                    break
+                except asyncio.TimeoutError:
+                    raise asyncio.TimeoutError("Request handler timed out") from None
+                await self._send_command("respond", id=request_id, data=item, done=False)
+        finally:
+            await items.aclose()
+        # The done frame carries no data, so the peer does not yield it
+        await self._send_command("respond", id=request_id, done=True)
+
+    async def request_stream(
+        self, peer_id: str, payload: Any, timeout: float = 10.0
+    ) -> AsyncIterator[Any]:
+        """Send a request to a single peer and iterate over its responses.
+
+        Args:
+            peer_id: Target peer ID
+            payload: JSON-serializable request payload
+            timeout: Deadline in seconds for the whole exchange
+
+        Raises:
+            RpcError: If the peer or the transport reports an error
+            asyncio.TimeoutError: If the deadline passes
+        """
+        await self._rate_limiter.acquire(
+            size=len(json.dumps(payload).encode()), peer=peer_id
+        )
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        request_id, frames = self._pending_requests.open()
+        try:
+            await self._send_command(
+                "request",
+                peer_id=peer_id,
+                id=request_id,
+                data=payload,
+                timeout_ms=int(timeout * 1000),
+            )
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError(f"Request to {peer_id} timed out")
+                frame = await asyncio.wait_for(frames.get(), remaining)
+                if frame.get("error"):
+                    raise RpcError(frame["error"])
+                if "data" in frame or not frame.get("done"):
+                    yield frame.get("data")
+                if frame.get("done"):
+                    return
+        finally:
+            self._pending_requests.close(request_id)
+
+    async def request(self, peer_id: str, payload: Any, timeout: float = 10.0) -> Any:
+        """Send a request to a single peer and return its first response."""
+        stream = self.request_stream(peer_id, payload, timeout)
+        try:
+            async for response in stream:
+                return response
+        finally:
+            await stream.aclose()
+        return None
+
+    @property
+    def requests_in_flight(self) -> int:
+        """Get the number of outstanding peer requests."""
+        return len(self._pending_requests)
+
+    async def start_stats_sampler(
+        self, interval: float = 1.0, capacity: int = 3600
+    ) -> None:
+        """Start sampling network stats and peer latencies into a ring buffer.
+
+        Readers query the history with stats_history() and
+        stats_aggregates() without issuing further bridge commands.
+        """
+        if self._sampler and self._sampler.running:
+            return
+        self._sampler = StatsSampler(
+            self._sample_stats, SAMPLED_FIELDS, interval, capacity
+        )
+        self._sampler.start()
+
+    async def stop_stats_sampler(self) -> None:
+        """Stop the stats sampler, keeping the collected history."""
+        if self._sampler:
+            await self._sampler.stop()
+
+    async def _sample_stats(self) -> Dict[str, float]:
+        """Collect one stats sample from the Go service."""
+        stats = await self.get_network_stats()
+        peers = await self.get_peers()
+
+        latencies = []
+        for peer in peers:
+            peer_id = peer.get("id") if isinstance(peer, dict) else peer
+            estimate = self._latency.get(peer_id) if peer_id else None
+            if estimate is not None and estimate.rtt is not None:
+                latencies.append(estimate.rtt)
+            elif isinstance(peer, dict):
+                reported = parse_duration(peer.get("latency") or "")
+                if reported is not None:
+                    latencies.append(reported)
+
+        sample = {
+            "connected_peers": stats.get("connected_peers", len(peers)),
+            "bandwidth": stats.get("bandwidth"),
+        }
+        if latencies:
+            sample["latency_min"] = min(latencies)
+            sample["latency_mean"] = sum(latencies) / len(latencies)
+            sample["latency_max"] = max(latencies)
+        return sample
+
+    def stats_history(self, seconds: Optional[float] = None) -> Dict[str, List[float]]:
+        """Get sampled stats of the last ``seconds`` as lists per field."""
+        if not self._sampler:
+            return {}
+        times, columns = self._sampler.buffer.window(seconds)
+        history = {name: column.tolist() for name, column in columns.items()}
+        history["timestamp"] = times.tolist()
+        return history
+
+    def stats_aggregates(
+        self, seconds: Optional[float] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Get min/max/mean, percentiles and rates of sampled stats."""
+        if not self._sampler:
+            return {}
+        return self._sampler.aggregates(seconds)
@@ -16,27 +16,72 @@ import (
 	"github.com/libp2p/go-libp2p-core/peer"
 	"github.com/libp2p/go-libp2p-core/protocol"
 	pubsub "github.com/libp2p/go-libp2p-pubsub"
+	"github.com/libp2p/go-libp2p/core/metrics"
+	"github.com/libp2p/go-libp2p/p2p/protocol/ping"
 	"github.com/multiformats/go-multiaddr"
 	zmq "github.com/pebbe/zmq4"
 )
 
 const (
 	textProtocolID = "/nadoomeshlink/text/1.0.0"
-	zmqPort       = "5555"
+	rpcProtocolID  = "/nadoomeshlink/rpc/1.0.0"
+	zmqPort        = "5555"
+	eventPort      = "5556"
+	pingTimeout    = 5 * time.Second
+	rpcTimeout     = 30 * time.Second
+	leaseCheck     = time.Second
+	startupGrace   = 30 * leaseCheck
 )
 
+// Message is a command from Python. The command name and all of its
+// arguments are top-level fields of a single JSON object.
 type Message struct {
-	Type    string      `json:"type"`
-	Payload interface{} `json:"payload"`
+	Command   string      `json:"command"`
+	Client    string      `json:"client,omitempty"`
+	Address   string      `json:"address,omitempty"`
+	Message   string      `json:"message,omitempty"`
+	Topic     string      `json:"topic,omitempty"`
+	Key       string      `json:"key,omitempty"`
+	Headers   interface{} `json:"headers,omitempty"`
+	PeerID    string      `json:"peer_id,omitempty"`
+	ID        string      `json:"id,omitempty"`
+	Data      interface{} `json:"data,omitempty"`
+	Done      bool        `json:"done,omitempty"`
+	Error     string      `json:"error,omitempty"`
+	TimeoutMs int64       `json:"timeout_ms,omitempty"`
+	Lease     float64     `json:"lease,omitempty"`
+	Enabled   bool        `json:"enabled,omitempty"`
 }
 
 type Response struct {
 	Success bool        `json:"success"`
-	Error   string     `json:"error,omitempty"`
-	Address string     `json:"address,omitempty"`
+	Error   string      `json:"error,omitempty"`
+	Address string      `json:"address,omitempty"`
+	Peers   []PeerInfo  `json:"peers,omitempty"`
 	Data    interface{} `json:"data,omitempty"`
 }
 
+// RPCFrame is a single request or response frame on an RPC stream and
+// is also what gets published to Python on the event socket.
+type RPCFrame struct {
+	ID        string      `json:"id"`
+	Peer      string      `json:"peer,omitempty"`
+	Data      interface{} `json:"data,omitempty"`
+	Done      bool        `json:"done,omitempty"`
+	Error     string      `json:"error,omitempty"`
+	TimeoutMs int64       `json:"timeout_ms,omitempty"`
+}
+
+// TopicMessage is the envelope published on gossipsub topics. The key
+// and headers let subscribers filter messages without decoding the data.
+type TopicMessage struct {
+	Topic   string            `json:"topic,omitempty"`
+	From    string            `json:"from,omitempty"`
+	Key     string            `json:"key,omitempty"`
+	Headers map[string]string `json:"headers,omitempty"`
+	Data    string            `json:"data"`
+}
+
 type PeerInfo struct {
 	ID        string   `json:"id"`
 	Addresses []string `json:"addresses"`
@@ -46,25 +91,37 @@ type PeerInfo struct {
 
 type NetworkStats struct {
 	ConnectedPeers int      `json:"connected_peers"`
-	Bandwidth      int64    `json:"bandwidth"`
+	Bandwidth      int64    `json:"bandwidth"` // bytes sent and received
 	PeerList       []string `json:"peer_list"`
 }
 
 type MeshNode struct {
-	host    libp2p.Host
-	pubsub  *pubsub.PubSub
-	topics  map[string]*pubsub.Topic
-	subs    map[string]*pubsub.Subscription
-	mutex   sync.RWMutex
-	socket  *zmq.Socket
+	host         libp2p.Host
+	pubsub       *pubsub.PubSub
+	bandwidth    *metrics.BandwidthCounter
+	topics       map[string]*pubsub.Topic
+	subs         map[string]*pubsub.Subscription
+	mutex        sync.RWMutex
+	socket       *zmq.Socket
+	events       *zmq.Socket
+	eventMutex   sync.Mutex
+	inbound      map[string]network.Stream
+	inboundMutex sync.Mutex
+	filters      map[string]map[string][]map[string]string
+	clients      map[string]time.Time
+	servers      []string
+	nextServer   int
+	clientMutex  sync.Mutex
 }
 
-func newMeshNode(socket *zmq.Socket) (*MeshNode, error) {
+func newMeshNode(socket *zmq.Socket, events *zmq.Socket) (*MeshNode, error) {
 	// Create libp2p node
+	bandwidth := metrics.NewBandwidthCounter()
 	host, err := libp2p.New(
 		libp2p.ListenAddrStrings("/ip4/0.0.0.0/tcp/0"),
 		libp2p.EnableAutoRelay(),
 		libp2p.EnableNATService(),
+		libp2p.BandwidthReporter(bandwidth),
 	)
 	if err != nil {
 		return nil, err
@@ -78,11 +135,16 @@ func newMeshNode(socket *zmq.Socket) (*MeshNode, error) {
 	}
 
 	return &MeshNode{
-		host:    host,
-		pubsub:  ps,
-		topics:  make(map[string]*pubsub.Topic),
-		subs:    make(map[string]*pubsub.Subscription),
-		socket:  socket,
+		host:      host,
+		pubsub:    ps,
+		bandwidth: bandwidth,
+		topics:    make(map[string]*pubsub.Topic),
+		subs:      make(map[string]*pubsub.Subscription),
+		socket:    socket,
+		events:    events,
+		inbound:   make(map[string]network.Stream),
+		filters:   make(map[string]map[string][]map[string]string),
+		clients:   make(map[string]time.Time),
 	}, nil
 }
 
@@ -100,79 +162,109 @@ func (n *MeshNode) handleZMQMessages() {
 			continue
 		}
 
-		switch message.Type {
+		switch message.Command {
 		case "connect":
-			if addr, ok := message.Payload.(string); ok {
-				err := n.connectToPeer(addr)
-				if err != nil {
-					sendResponse(n.socket, Response{Success: false, Error: err.Error()})
-				} else {
-					sendResponse(n.socket, Response{Success: true})
-				}
-			} else {
+			if message.Address == "" {
 				sendResponse(n.socket, Response{Success: false, Error: "Invalid peer address"})
+			} else if err := n.connectToPeer(message.Address); err != nil {
+				sendResponse(n.socket, Response{Success: false, Error: err.Error()})
+			} else {
+				sendResponse(n.socket, Response{Success: true})
 			}
 
 		case "broadcast":
-			if data, ok := message.Payload.(string); ok {
-				n.broadcastMessage(data)
-				sendResponse(n.socket, Response{Success: true})
-			} else {
-				sendResponse(n.socket, Response{Success: false, Error: "Invalid message format"})
-			}
+			n.broadcastMessage(message.Message)
+			sendResponse(n.socket, Response{Success: true})
 
-		case "get_address":
+		case "address":
 			addr := n.host.Addrs()[0].String() + "/p2p/" + n.host.ID().Pretty()
 			sendResponse(n.socket, Response{Success: true, Address: addr})
 
-		case "join_topic":
-			if topic, ok := message.Payload.(string); ok {
-				err := n.joinTopic(topic)
-				if err != nil {
-					sendResponse(n.socket, Response{Success: false, Error: err.Error()})
-				} else {
-					sendResponse(n.socket, Response{Success: true})
-				}
-			} else {
+		case "join":
+			if message.Topic == "" {
 				sendResponse(n.socket, Response{Success: false, Error: "Invalid topic name"})
+			} else if err := n.joinTopic(message.Topic); err != nil {
+				sendResponse(n.socket, Response{Success: false, Error: err.Error()})
+			} else {
+				sendResponse(n.socket, Response{Success: true})
 			}
 
-		case "publish_to_topic":
-			if payload, ok := message.Payload.(map[string]interface{}); ok {
-				topic := payload["topic"].(string)
-				data := payload["data"].(string)
-				err := n.publishToTopic(topic, data)
-				if err != nil {
-					sendResponse(n.socket, Response{Success: false, Error: err.Error()})
-				} else {
-					sendResponse(n.socket, Response{Success: true})
-				}
+		case "publish":
+			topicMessage := TopicMessage{
+				Data:    message.Message,
+				Key:     message.Key,
+				Headers: toStringMap(message.Headers),
+			}
+			if err := n.publishToTopic(message.Topic, topicMessage); err != nil {
+				sendResponse(n.socket, Response{Success: false, Error: err.Error()})
 			} else {
-				sendResponse(n.socket, Response{Success: false, Error: "Invalid topic message format"})
+				sendResponse(n.socket, Response{Success: true})
 			}
 
-		case "get_peers":
-			peers := n.getPeerList()
-			sendResponse(n.socket, Response{Success: true, Data: peers})
+		case "peers":
+			sendResponse(n.socket, Response{Success: true, Peers: n.getPeerList()})
 
-		case "get_network_stats":
+		case "stats":
 			stats := n.getNetworkStats()
 			sendResponse(n.socket, Response{Success: true, Data: stats})
 
-		case "disconnect_peer":
-			if peerID, ok := message.Payload.(string); ok {
-				err := n.disconnectPeer(peerID)
-				if err != nil {
-					sendResponse(n.socket, Response{Success: false, Error: err.Error()})
-				} else {
-					sendResponse(n.socket, Response{Success: true})
-				}
+		case "disconnect":
+			if err := n.disconnectPeer(message.PeerID); err != nil {
+				sendResponse(n.socket, Response{Success: false, Error: err.Error()})
 			} else {
-				sendResponse(n.socket, Response{Success: false, Error: "Invalid peer ID"})
+				sendResponse(n.socket, Response{Success: true})
+			}
+
+		case "ping":
+			// The RTT arrives as an event so that an unreachable peer
+			// does not hold up the commands queued behind this one
+			n.sendPing(message.Client, message.PeerID, message.ID)
+			sendResponse(n.socket, Response{Success: true})
+
+		case "set_filter":
+			// A missing list clears the client's filter, an empty list
+			// means the client wants every message
+			list, subscribed := message.Headers.([]interface{})
+			headers := make([]map[string]string, 0, len(list))
+			for _, item := range list {
+				headers = append(headers, toStringMap(item))
+			}
+			n.setFilter(message.Topic, message.Client, headers, subscribed)
+			sendResponse(n.socket, Response{Success: true})
+
+		case "attach":
+			// Attaching again renews the client's lease
+			n.attachClient(message.Client, time.Duration(message.Lease*float64(time.Second)))
+			sendResponse(n.socket, Response{Success: true})
+
+		case "detach":
+			n.detachClient(message.Client)
+			sendResponse(n.socket, Response{Success: true})
+
+		case "serve":
+			n.setServer(message.Client, message.Enabled)
+			sendResponse(n.socket, Response{Success: true})
+
+		case "request":
+			timeout := time.Duration(message.TimeoutMs) * time.Millisecond
+			n.sendRequest(message.Client, message.PeerID, message.ID, message.Data, timeout)
+			sendResponse(n.socket, Response{Success: true})
+
+		case "respond":
+			frame := RPCFrame{
+				ID:    message.ID,
+				Data:  message.Data,
+				Done:  message.Done,
+				Error: message.Error,
+			}
+			if err := n.respond(frame); err != nil {
+				sendResponse(n.socket, Response{Success: false, Error: err.Error()})
+			} else {
+				sendResponse(n.socket, Response{Success: true})
 			}
 
 		default:
-			sendResponse(n.socket, Response{Success: false, Error: "Unknown message type"})
+			sendResponse(n.socket, Response{Success: false, Error: "Unknown command: " + message.Command})
 		}
 	}
 }
@@ -217,11 +309,184 @@ func (n *MeshNode) handleTopicMessages(topic string, sub *pubsub.Subscription) {
 			continue
 		}
 
-		fmt.Printf("Received message on topic %s from %s: %s\n", topic, msg.ReceivedFrom, string(msg.Data))
+		var message TopicMessage
+		if err := json.Unmarshal(msg.Data, &message); err != nil {
+			// Plain payload from a peer that does not use the envelope
+			message = TopicMessage{Data: string(msg.Data)}
+		}
+		if !n.matchesFilter(topic, message.Headers) {
+			continue
+		}
+
+		message.Topic = topic
+		message.From = msg.ReceivedFrom.String()
+
+		// The key is part of the ZMQ topic so SUB prefix filters apply
+		// before the message leaves this process
+		n.publishEvent("msg/"+topic+"\x00"+message.Key, message)
+	}
+}
+
+func (n *MeshNode) setFilter(topic string, client string, headers []map[string]string, subscribed bool) {
+	n.mutex.Lock()
+	defer n.mutex.Unlock()
+
+	if !subscribed {
+		delete(n.filters[topic], client)
+		if len(n.filters[topic]) == 0 {
+			delete(n.filters, topic)
+		}
+		return
+	}
+
+	if n.filters[topic] == nil {
+		n.filters[topic] = make(map[string][]map[string]string)
+	}
+	n.filters[topic][client] = headers
+}
+
+// matchesFilter reports whether the message is wanted by any client:
+// a client without header filters wants everything, otherwise one of its
+// filters must match. Topics without registered clients accept all.
+func (n *MeshNode) matchesFilter(topic string, headers map[string]string) bool {
+	n.mutex.RLock()
+	defer n.mutex.RUnlock()
+
+	clients, exists := n.filters[topic]
+	if !exists {
+		return true
+	}
+
+	for _, filters := range clients {
+		if len(filters) == 0 {
+			return true
+		}
+		for _, filter := range filters {
+			matched := true
+			for key, value := range filter {
+				if headers[key] != value {
+					matched = false
+					break
+				}
+			}
+			if matched {
+				return true
+			}
+		}
+	}
+	return false
+}
+
+func (n *MeshNode) attachClient(client string, lease time.Duration) {
+	n.clientMutex.Lock()
+	defer n.clientMutex.Unlock()
+
+	// A zero lease never expires; such clients must detach explicitly
+	expires := time.Time{}
+	if lease > 0 {
+		expires = time.Now().Add(lease)
+	}
+	n.clients[client] = expires
+}
+
+func (n *MeshNode) detachClient(client string) {
+	n.clientMutex.Lock()
+	defer n.clientMutex.Unlock()
+	n.removeClientLocked(client)
+}
+
+func (n *MeshNode) removeClientLocked(client string) {
+	delete(n.clients, client)
+	for i, server := range n.servers {
+		if server == client {
+			n.servers = append(n.servers[:i], n.servers[i+1:]...)
+			break
+		}
+	}
+
+	n.mutex.Lock()
+	for topic, clients := range n.filters {
+		delete(clients, client)
+		if len(clients) == 0 {
+			delete(n.filters, topic)
+		}
+	}
+	n.mutex.Unlock()
+}
+
+// watchClients drops clients whose lease ran out and signals done once
+// the last client of a shared daemon has gone, or when no client has
+// attached within startupGrace (e.g. the spawning process died first).
+func (n *MeshNode) watchClients(done chan<- os.Signal) {
+	attached := false
+	started := time.Now()
+	for range time.Tick(leaseCheck) {
+		n.clientMutex.Lock()
+		now := time.Now()
+		for client, expires := range n.clients {
+			if !expires.IsZero() && now.After(expires) {
+				fmt.Printf("Client %s lease expired\n", client)
+				n.removeClientLocked(client)
+			}
+		}
+		remaining := len(n.clients)
+		n.clientMutex.Unlock()
+
+		if remaining > 0 {
+			attached = true
+		} else if attached {
+			fmt.Println("Last client detached")
+			done <- syscall.SIGTERM
+			return
+		} else if now.Sub(started) > startupGrace {
+			fmt.Println("No client attached after startup")
+			done <- syscall.SIGTERM
+			return
+		}
+	}
+}
+
+func (n *MeshNode) setServer(client string, enabled bool) {
+	n.clientMutex.Lock()
+	defer n.clientMutex.Unlock()
+
+	for i, server := range n.servers {
+		if server == client {
+			n.servers = append(n.servers[:i], n.servers[i+1:]...)
+			break
+		}
+	}
+	if enabled {
+		n.servers = append(n.servers, client)
+	}
+}
+
+// pickServer chooses the client answering the next incoming request,
+// rotating between all clients that registered a handler.
+func (n *MeshNode) pickServer() (string, bool) {
+	n.clientMutex.Lock()
+	defer n.clientMutex.Unlock()
+
+	if len(n.servers) == 0 {
+		return "", false
+	}
+	n.nextServer = (n.nextServer + 1) % len(n.servers)
+	return n.servers[n.nextServer], true
+}
+
+func toStringMap(value interface{}) map[string]string {
+	result := make(map[string]string)
+	if m, ok := value.(map[string]interface{}); ok {
+		for key, item := range m {
+			if str, ok := item.(string); ok {
+				result[key] = str
+			}
+		}
 	}
+	return result
 }
 
-func (n *MeshNode) publishToTopic(topic string, data string) error {
+func (n *MeshNode) publishToTopic(topic string, message TopicMessage) error {
 	n.mutex.RLock()
 	t, exists := n.topics[topic]
 	n.mutex.RUnlock()
@@ -230,7 +495,12 @@ func (n *MeshNode) publishToTopic(topic string, data string) error {
 		return fmt.Errorf("not subscribed to topic: %s", topic)
 	}
 
-	return t.Publish(context.Background(), []byte(data))
+	data, err := json.Marshal(message)
+	if err != nil {
+		return fmt.Errorf("failed to encode message: %v", err)
+	}
+
+	return t.Publish(context.Background(), data)
 }
 
 func (n *MeshNode) getPeerList() []PeerInfo {
@@ -267,8 +537,10 @@ func (n *MeshNode) getPeerList() []PeerInfo {
 
 func (n *MeshNode) getNetworkStats() NetworkStats {
 	peers := n.host.Network().Peers()
+	totals := n.bandwidth.GetBandwidthTotals()
 	stats := NetworkStats{
 		ConnectedPeers: len(peers),
+		Bandwidth:      totals.TotalIn + totals.TotalOut,
 		PeerList:       make([]string, len(peers)),
 	}
 
@@ -288,6 +560,175 @@ func (n *MeshNode) disconnectPeer(peerID string) error {
 	return n.host.Network().ClosePeer(pid)
 }
 
+func (n *MeshNode) pingPeer(peerID string) (time.Duration, error) {
+	pid, err := peer.Decode(peerID)
+	if err != nil {
+		return 0, fmt.Errorf("invalid peer ID: %v", err)
+	}
+
+	ctx, cancel := context.WithTimeout(context.Background(), pingTimeout)
+	defer cancel()
+
+	result := <-ping.Ping(ctx, n.host, pid)
+	if result.Error != nil {
+		return 0, fmt.Errorf("ping failed: %v", result.Error)
+	}
+
+	return result.RTT, nil
+}
+
+// sendPing pings a peer in the background and publishes the RTT in
+// seconds as an "rpc/response/<client>" event.
+func (n *MeshNode) sendPing(client string, peerID string, id string) {
+	go func() {
+		frame := RPCFrame{ID: id, Peer: peerID, Done: true}
+		if rtt, err := n.pingPeer(peerID); err != nil {
+			frame.Error = err.Error()
+		} else {
+			frame.Data = rtt.Seconds()
+		}
+		n.publishEvent("rpc/response/"+client, frame)
+	}()
+}
+
+func (n *MeshNode) publishEvent(kind string, event interface{}) {
+	eventBytes, err := json.Marshal(event)
+	if err != nil {
+		fmt.Printf("Error marshaling event: %v\n", err)
+		return
+	}
+
+	// ZMQ sockets are not thread-safe and events come from many goroutines
+	n.eventMutex.Lock()
+	defer n.eventMutex.Unlock()
+	if _, err := n.events.SendMessage(kind, eventBytes); err != nil {
+		fmt.Printf("Error publishing event: %v\n", err)
+	}
+}
+
+// sendRequest opens an RPC stream to a peer in the background and
+// publishes every response frame as an "rpc/response/<client>" event.
+func (n *MeshNode) sendRequest(client string, peerID string, id string, data interface{}, timeout time.Duration) {
+	if timeout <= 0 {
+		timeout = rpcTimeout
+	}
+
+	kind := "rpc/response/" + client
+	go func() {
+		fail := func(err error) {
+			n.publishEvent(kind, RPCFrame{ID: id, Peer: peerID, Done: true, Error: err.Error()})
+		}
+
+		pid, err := peer.Decode(peerID)
+		if err != nil {
+			fail(fmt.Errorf("invalid peer ID: %v", err))
+			return
+		}
+
+		ctx, cancel := context.WithTimeout(context.Background(), timeout)
+		defer cancel()
+
+		stream, err := n.host.NewStream(ctx, pid, protocol.ID(rpcProtocolID))
+		if err != nil {
+			fail(fmt.Errorf("failed to open stream: %v", err))
+			return
+		}
+		defer stream.Close()
+		stream.SetDeadline(time.Now().Add(timeout))
+
+		request := RPCFrame{ID: id, Data: data, TimeoutMs: timeout.Milliseconds()}
+		if err := json.NewEncoder(stream).Encode(request); err != nil {
+			fail(fmt.Errorf("failed to send request: %v", err))
+			return
+		}
+		stream.CloseWrite()
+
+		decoder := json.NewDecoder(bufio.NewReader(stream))
+		for {
+			var frame RPCFrame
+			if err := decoder.Decode(&frame); err != nil {
+				fail(fmt.Errorf("failed to read response: %v", err))
+				return
+			}
+			frame.ID = id
+			frame.Peer = peerID
+			n.publishEvent(kind, frame)
+			if frame.Done {
+				return
+			}
+		}
+	}()
+}
+
+// handleRPCStream reads an incoming request and hands it to Python as an
+// "rpc/request/<client>" event for one serving client; the answer comes
+// back through the respond command.
+func (n *MeshNode) handleRPCStream(stream network.Stream) {
+	var request RPCFrame
+	if err := json.NewDecoder(bufio.NewReader(stream)).Decode(&request); err != nil {
+		stream.Reset()
+		return
+	}
+
+	server, ok := n.pickServer()
+	if !ok {
+		json.NewEncoder(stream).Encode(RPCFrame{Done: true, Error: "no request handler registered"})
+		stream.Close()
+		return
+	}
+
+	timeout := time.Duration(request.TimeoutMs) * time.Millisecond
+	if timeout <= 0 || timeout > rpcTimeout {
+		timeout = rpcTimeout
+	}
+	stream.SetDeadline(time.Now().Add(timeout))
+
+	id := stream.ID()
+	n.inboundMutex.Lock()
+	n.inbound[id] = stream
+	n.inboundMutex.Unlock()
+
+	// Drop requests Python never answers once their deadline has passed
+	time.AfterFunc(timeout, func() {
+		n.inboundMutex.Lock()
+		defer n.inboundMutex.Unlock()
+		if s, exists := n.inbound[id]; exists {
+			delete(n.inbound, id)
+			s.Reset()
+		}
+	})
+
+	n.publishEvent("rpc/request/"+server, RPCFrame{
+		ID:        id,
+		Peer:      stream.Conn().RemotePeer().String(),
+		Data:      request.Data,
+		TimeoutMs: timeout.Milliseconds(),
+	})
+}
+
+func (n *MeshNode) respond(frame RPCFrame) error {
+	n.inboundMutex.Lock()
+	stream, exists := n.inbound[frame.ID]
+	if exists && frame.Done {
+		delete(n.inbound, frame.ID)
+	}
+	n.inboundMutex.Unlock()
+
+	if !exists {
+		return fmt.Errorf("unknown or expired request: %s", frame.ID)
+	}
+
+	if err := json.NewEncoder(stream).Encode(frame); err != nil {
+		stream.Reset()
+		return fmt.Errorf("failed to send response: %v", err)
+	}
+
+	if frame.Done {
+		return stream.Close()
+	}
+	return nil
+}
+
 func (n *MeshNode) connectToPeer(peerAddr string) error {
 	maddr, err := multiaddr.NewMultiaddr(peerAddr)
 	if err != nil {
@@ -324,13 +765,36 @@ func sendResponse(socket *zmq.Socket, response Response) {
 		fmt.Printf("Error marshaling response: %v\n", err)
 		return
 	}
-	
+
 	if err := socket.SendBytes(responseBytes, 0); err != nil {
 		fmt.Printf("Error sending response: %v\n", err)
 	}
 }
 
+func getEnv(key string, fallback string) string {
+	if value := os.Getenv(key); value != "" {
+		return value
+	}
+	return fallback
+}
+
 func main() {
+	// Endpoints can be overridden, e.g. with ipc:// for a shared daemon
+	commandEndpoint := getEnv("MESHLINK_COMMAND_ENDPOINT", "tcp://*:"+zmqPort)
+	eventEndpoint := getEnv("MESHLINK_EVENT_ENDPOINT", "tcp://*:"+eventPort)
+	shared := os.Getenv("MESHLINK_SHARED") == "1"
+
+	// A shared daemon holds its pidfile lock for as long as it runs;
+	// binding the IPC endpoints of a live daemon would take them over
+	if pidPath := os.Getenv("MESHLINK_PIDFILE"); pidPath != "" {
+		pidFile, err := lockPidFile(pidPath)
+		if err != nil {
+			fmt.Println(err)
+			os.Exit(1)
+		}
+		defer pidFile.Close()
+	}
+
 	// Create ZMQ context and socket
 	socket, err := zmq.NewSocket(zmq.REP)
 	if err != nil {
@@ -338,12 +802,23 @@ func main() {
 	}
 	defer socket.Close()
 
-	if err := socket.Bind("tcp://*:" + zmqPort); err != nil {
+	if err := socket.Bind(commandEndpoint); err != nil {
+		panic(err)
+	}
+
+	// Create event socket for messages pushed to Python
+	events, err := zmq.NewSocket(zmq.PUB)
+	if err != nil {
+		panic(err)
+	}
+	defer events.Close()
+
+	if err := events.Bind(eventEndpoint); err != nil {
 		panic(err)
 	}
 
 	// Create mesh node
-	node, err := newMeshNode(socket)
+	node, err := newMeshNode(socket, events)
 	if err != nil {
 		panic(err)
 	}
@@ -364,6 +839,8 @@ func main() {
 		}()
 	})
 
+	node.host.SetStreamHandler(protocol.ID(rpcProtocolID), node.handleRPCStream)
+
 	// Output node address for debugging
 	fmt.Println("Node address:", node.host.Addrs()[0].String()+"/p2p/"+node.host.ID().Pretty())
 
@@ -373,6 +850,11 @@ func main() {
 	// Wait for interrupt signal
 	ch := make(chan os.Signal, 1)
 	signal.Notify(ch, syscall.SIGINT, syscall.SIGTERM)
+
+	// A shared daemon exits once its last client has detached
+	if shared {
+		go node.watchClients(ch)
+	}
 	<-ch
 	fmt.Println("Shutting down...")
 }
@@ -0,0 +1,13 @@
+//go:build !unix
+
+package main
+
+import (
+	"fmt"
+	"os"
+)
+
+// lockPidFile is unavailable where shared daemons are not supported.
+func lockPidFile(path string) (*os.File, error) {
+	return nil, fmt.Errorf("shared daemon mode is not supported on this platform")
+}
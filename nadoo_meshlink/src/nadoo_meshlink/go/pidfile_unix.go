@@ -0,0 +1,28 @@
+//go:build unix
+
+package main
+
+import (
+	"fmt"
+	"os"
+	"syscall"
+)
+
+// lockPidFile takes an exclusive lock on path and writes the process ID
+// to it. The lock is held until the process exits, so clients can tell
+// whether a shared daemon is alive without sending it a command.
+func lockPidFile(path string) (*os.File, error) {
+	file, err := os.OpenFile(path, os.O_RDWR|os.O_CREATE, 0o600)
+	if err != nil {
+		return nil, err
+	}
+
+	if err := syscall.Flock(int(file.Fd()), syscall.LOCK_EX|syscall.LOCK_NB); err != nil {
+		file.Close()
+		return nil, fmt.Errorf("shared daemon already running: %v", err)
+	}
+
+	file.Truncate(0)
+	fmt.Fprintf(file, "%d\n", os.Getpid())
+	return file, nil
+}
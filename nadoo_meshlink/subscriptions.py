@@ -0,0 +1,78 @@
+"""NADOO MeshLink Topic Subscription Module."""
+import inspect
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, Union
+
+if TYPE_CHECKING:
+    from nadoo_meshlink.services.meshlink_service import MeshLinkService
+
+MessageCallback = Callable[[Dict[str, Any]], Union[None, Awaitable[None]]]
+
+
+@dataclass
+class TopicFilter:
+    """Filter selecting the topic messages a subscription receives.
+
+    Args:
+        prefixes: Accepted key prefixes; empty accepts every key
+        headers: Header values that must all match; empty accepts all
+    """
+
+    prefixes: List[str] = field(default_factory=list)
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    def matches(self, key: str, headers: Optional[Dict[str, str]]) -> bool:
+        """Check whether a message passes this filter."""
+        if self.prefixes and not any(key.startswith(p) for p in self.prefixes):
+            return False
+        headers = headers or {}
+        return all(headers.get(name) == value for name, value in self.headers.items())
+
+
+def event_prefixes(topic: str, topic_filter: Optional[TopicFilter]) -> List[bytes]:
+    """Get the ZMQ SUB prefixes delivering a topic's messages.
+
+    Topic messages are published as ``msg/<topic>\\0<key>``, so key prefixes
+    are enforced by ZMQ itself before messages reach Python.
+    """
+    base = f"msg/{topic}\0"
+    if topic_filter is None or not topic_filter.prefixes:
+        return [base.encode()]
+    return [(base + prefix).encode() for prefix in topic_filter.prefixes]
+
+
+class Subscription:
+    """A callback receiving filtered messages of a single topic."""
+
+    def __init__(
+        self,
+        service: "MeshLinkService",
+        topic: str,
+        callback: MessageCallback,
+        topic_filter: Optional[TopicFilter] = None,
+    ):
+        """Initialize Subscription."""
+        self._service = service
+        self.topic = topic
+        self.callback = callback
+        self.filter = topic_filter
+        self.active = True
+
+    def matches(self, message: Dict[str, Any]) -> bool:
+        """Check whether a received message is meant for this subscription."""
+        if self.filter is None:
+            return True
+        return self.filter.matches(message.get("key", ""), message.get("headers"))
+
+    def deliver(self, message: Dict[str, Any]) -> Optional[Awaitable[None]]:
+        """Invoke the callback, returning an awaitable for async callbacks."""
+        result = self.callback(message)
+        return result if inspect.isawaitable(result) else None
+
+    async def set_filter(self, topic_filter: Optional[TopicFilter]) -> None:
+        """Replace the filter without resubscribing."""
+        await self._service._update_subscription(self, topic_filter)
+
+    async def unsubscribe(self) -> None:
+        """Stop receiving messages."""
+        await self._service.unsubscribe(self)
@@ -0,0 +1,258 @@
+"""NADOO MeshLink Synchronous Client Module."""
+import asyncio
+import itertools
+import json
+import logging
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import zmq
+import zmq.asyncio
+
+logger = logging.getLogger(__name__)
+
+
+class SyncMeshLinkClient:
+    """Thread-safe blocking client for the MeshLink Go service.
+
+    All ZeroMQ I/O happens on one background event-loop thread. Calls from
+    any number of threads are appended to a submission deque (append and
+    popleft are atomic, so no lock is taken) and answered through futures.
+    A DEALER socket sends requests back to back without waiting for each
+    reply. Each request carries an ID in its envelope, which the Go REP
+    socket echoes back, so a lost reply only ever affects its own caller.
+    """
+
+    def __init__(self, endpoint: str = "tcp://localhost:5555", timeout: float = 10.0):
+        """Initialize the client.
+
+        Args:
+            endpoint: ZeroMQ command endpoint of the MeshLink service
+            timeout: Default seconds to wait for a reply
+        """
+        self._endpoint = endpoint
+        self._timeout = timeout
+        self._client_id = uuid.uuid4().hex
+        self._request_ids = itertools.count()
+        self._submissions: Deque[Tuple[bytes, bytes, Future]] = deque()
+        self._in_flight: Dict[bytes, Future] = {}
+        self._wakeup_pending = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._startup_error: Optional[BaseException] = None
+
+    def connect(self) -> None:
+        """Start the I/O thread and connect to the MeshLink service."""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._ready.clear()
+        self._startup_error = None
+        self._thread = threading.Thread(
+            target=self._run, name="meshlink-io", daemon=True
+        )
+        self._thread.start()
+        self._ready.wait()
+        if self._startup_error:
+            raise RuntimeError(
+                "Failed to start MeshLink I/O thread"
+            ) from self._startup_error
+        logger.info("Connected to MeshLink service")
+
+    def close(self) -> None:
+        """Stop the I/O thread; outstanding calls fail with RuntimeError."""
+        if not self._thread:
+            return
+        if self._loop and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._thread = None
+        logger.info("Disconnected from MeshLink service")
+
+    def __enter__(self) -> "SyncMeshLinkClient":
+        """Connect when used as a context manager."""
+        self.connect()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Close when leaving the context manager."""
+        self.close()
+
+    def _run(self) -> None:
+        """Run the event loop owning the socket until close()."""
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        context = zmq.asyncio.Context()
+        socket = None
+        tasks: List[asyncio.Task] = []
+        try:
+            socket = context.socket(zmq.DEALER)
+            socket.connect(self._endpoint)
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+            tasks = [
+                loop.create_task(self._send_loop(socket)),
+                loop.create_task(self._receive_loop(socket)),
+            ]
+        except BaseException as e:
+            self._startup_error = e
+            self._ready.set()
+            context.term()
+            loop.close()
+            return
+
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self._loop = None
+            socket.close(linger=0)
+            context.term()
+            loop.close()
+            self._fail_outstanding()
+
+    def _fail_outstanding(self) -> None:
+        """Fail calls that will never be answered."""
+        error = RuntimeError("MeshLink client closed")
+        while self._in_flight:
+            _, future = self._in_flight.popitem()
+            if not future.done():
+                future.set_exception(error)
+        while self._submissions:
+            _, _, future = self._submissions.popleft()
+            if future.set_running_or_notify_cancel():
+                future.set_exception(error)
+
+    def _wake(self) -> None:
+        """Wake the sender on the I/O loop (runs on the loop thread)."""
+        self._wakeup.set()
+
+    async def _send_loop(self, socket: zmq.asyncio.Socket) -> None:
+        """Send every submitted request as soon as it arrives."""
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            # Reset before draining: a submitter seeing True is then
+            # guaranteed that its request is picked up by this drain
+            self._wakeup_pending = False
+            while self._submissions:
+                request_id, request, future = self._submissions.popleft()
+                # Registered before it can no longer be cancelled, so a
+                # caller giving up always finds it here or cancels it
+                self._in_flight[request_id] = future
+                if not future.set_running_or_notify_cancel():
+                    del self._in_flight[request_id]
+                    continue
+                try:
+                    await socket.send_multipart([request_id, b"", request])
+                except Exception as e:
+                    self._in_flight.pop(request_id, None)
+                    future.set_exception(e)
+
+    async def _receive_loop(self, socket: zmq.asyncio.Socket) -> None:
+        """Resolve the future of each reply by the request ID it carries."""
+        while True:
+            frames = await socket.recv_multipart()
+            future = self._in_flight.pop(frames[0], None)
+            if future is None or len(frames) != 3:
+                # The caller gave up on this request already
+                logger.debug("Discarding unexpected reply from MeshLink service")
+                continue
+            if future.done():
+                continue
+            try:
+                response = json.loads(frames[-1])
+            except ValueError as e:
+                future.set_exception(e)
+                continue
+            if response.get("error"):
+                future.set_exception(RuntimeError(response["error"]))
+            else:
+                future.set_result(response)
+
+    def submit(self, command: str, **kwargs) -> Future:
+        """Queue a command from any thread without blocking.
+
+        A reply that never arrives leaves the future pending; use
+        send_command() to wait with a timeout.
+
+        Returns:
+            Future: Resolves to the service response
+        """
+        return self._submit(command, kwargs)[1]
+
+    def _submit(self, command: str, kwargs: Dict[str, Any]) -> Tuple[bytes, Future]:
+        """Queue a command and get its request ID and future."""
+        if not self._thread or not self._loop:
+            raise RuntimeError("Not connected to MeshLink service")
+
+        message = {"command": command, "client": self._client_id, **kwargs}
+        request_id = str(next(self._request_ids)).encode()
+        future: Future = Future()
+        self._submissions.append((request_id, json.dumps(message).encode(), future))
+        if not self._wakeup_pending:
+            self._wakeup_pending = True
+            self._loop.call_soon_threadsafe(self._wake)
+        return request_id, future
+
+    def send_command(
+        self, command: str, timeout: Optional[float] = None, **kwargs
+    ) -> Dict[str, Any]:
+        """Send a command and block until its reply arrives.
+
+        Raises:
+            RuntimeError: If not connected or the command fails
+            concurrent.futures.TimeoutError: If no reply arrives in time
+        """
+        request_id, future = self._submit(command, kwargs)
+        try:
+            return future.result(self._timeout if timeout is None else timeout)
+        except FutureTimeoutError:
+            if not future.cancel():
+                # Already sent; forget it so a lost reply cannot pin it
+                self._in_flight.pop(request_id, None)
+            raise
+
+    def connect_to_peer(self, address: str) -> Dict[str, Any]:
+        """Connect to a peer."""
+        return self.send_command("connect", address=address)
+
+    def broadcast_message(self, message: str) -> Dict[str, Any]:
+        """Broadcast a message to all peers."""
+        return self.send_command("broadcast", message=message)
+
+    def join_topic(self, topic: str) -> Dict[str, Any]:
+        """Join a topic."""
+        return self.send_command("join", topic=topic)
+
+    def publish_to_topic(
+        self,
+        topic: str,
+        message: str,
+        key: str = "",
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        """Publish a message to a topic."""
+        return self.send_command(
+            "publish", topic=topic, message=message, key=key, headers=headers or {}
+        )
+
+    def get_node_address(self) -> str:
+        """Get the node's address."""
+        return self.send_command("address")["address"]
+
+    def get_peers(self) -> List[str]:
+        """Get list of connected peers."""
+        return self.send_command("peers").get("peers") or []
+
+    def get_network_stats(self) -> Dict[str, Any]:
+        """Get network statistics."""
+        return self.send_command("stats").get("data") or {}
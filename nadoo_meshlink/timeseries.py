@@ -0,0 +1,208 @@
+"""NADOO MeshLink Time Series Module."""
+import asyncio
+import logging
+import math
+import time
+from array import array
+from bisect import bisect_left
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def percentile(ordered: Sequence[float], q: float) -> float:
+    """Get the q-th percentile (0-100) of sorted values by interpolation."""
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+class RingBuffer:
+    """Fixed-size columnar time series backed by ``array('d')`` columns.
+
+    Memory is allocated once up front; appending overwrites the oldest
+    sample once the buffer is full. Missing values are stored as NaN.
+    """
+
+    def __init__(self, fields: Iterable[str], capacity: int = 3600):
+        """Initialize RingBuffer."""
+        if capacity <= 0:
+            raise ValueError("Ring buffer capacity must be positive")
+        self.fields = tuple(fields)
+        self.capacity = capacity
+        self._times = array("d", [0.0]) * capacity
+        self._columns = {name: array("d", [math.nan]) * capacity for name in self.fields}
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        """Get the number of stored samples."""
+        return self._size
+
+    def append(self, timestamp: float, values: Dict[str, float]) -> None:
+        """Store one sample."""
+        index = self._next
+        self._times[index] = timestamp
+        for name, column in self._columns.items():
+            value = values.get(name)
+            column[index] = math.nan if value is None else float(value)
+        self._next = (index + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def _chronological(self, column: array) -> array:
+        """Get a column's stored values oldest first."""
+        if self._size < self.capacity:
+            return column[: self._size]
+        return column[self._next:] + column[: self._next]
+
+    def window(
+        self,
+        seconds: Optional[float] = None,
+        now: Optional[float] = None,
+        fields: Optional[Iterable[str]] = None,
+    ) -> Tuple[array, Dict[str, array]]:
+        """Get timestamps and columns of the samples within a time window.
+
+        Args:
+            seconds: Window length, or None for everything stored
+            now: End of the window, defaults to the current time
+            fields: Columns to return, defaults to all
+        """
+        times = self._chronological(self._times)
+        start = 0
+        if seconds is not None:
+            now = time.time() if now is None else now
+            start = bisect_left(times, now - seconds)
+        names = self.fields if fields is None else fields
+        columns = {
+            name: self._chronological(self._columns[name])[start:] for name in names
+        }
+        return times[start:], columns
+
+    def latest(self) -> Optional[Dict[str, float]]:
+        """Get the most recent sample including its timestamp."""
+        if not self._size:
+            return None
+        index = (self._next - 1) % self.capacity
+        sample = {name: column[index] for name, column in self._columns.items()}
+        sample["timestamp"] = self._times[index]
+        return sample
+
+    def aggregate(self, field: str, seconds: Optional[float] = None) -> Dict[str, float]:
+        """Get count, min/max/mean, percentiles and rate of one field.
+
+        ``rate`` is the change per second between the first and last sample
+        of the window, which is meaningful for counters such as bandwidth.
+        """
+        if field not in self._columns:
+            raise KeyError(f"Unknown field: {field}")
+
+        times, columns = self.window(seconds, fields=[field])
+        values = columns[field]
+        total = math.fsum(values)
+        if math.isnan(total):
+            # Slow path only when some samples lack this field
+            keep = [index for index, value in enumerate(values) if value == value]
+            times = array("d", (times[index] for index in keep))
+            values = array("d", (values[index] for index in keep))
+            total = math.fsum(values)
+        if not values:
+            return {"count": 0}
+
+        ordered = sorted(values)
+        elapsed = times[-1] - times[0]
+        return {
+            "count": len(values),
+            "min": ordered[0],
+            "max": ordered[-1],
+            "mean": total / len(values),
+            "p50": percentile(ordered, 50),
+            "p90": percentile(ordered, 90),
+            "p99": percentile(ordered, 99),
+            "rate": (values[-1] - values[0]) / elapsed if elapsed > 0 else 0.0,
+        }
+
+
+class StatsSampler:
+    """Polls a metrics source on a fixed interval into a RingBuffer."""
+
+    def __init__(
+        self,
+        poll: Callable[[], Awaitable[Dict[str, float]]],
+        fields: Iterable[str],
+        interval: float = 1.0,
+        capacity: int = 3600,
+    ):
+        """Initialize StatsSampler.
+
+        Args:
+            poll: Coroutine function returning one sample
+            fields: Sample keys to store
+            interval: Seconds between samples
+            capacity: Number of samples kept
+        """
+        self.interval = interval
+        self.buffer = RingBuffer(fields, capacity)
+        self._poll = poll
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        """Check whether the sampler is running."""
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start sampling in the background."""
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop sampling."""
+        if not self._task:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        """Take a sample every interval, keeping a fixed schedule."""
+        loop = asyncio.get_running_loop()
+        next_sample = loop.time()
+        while True:
+            try:
+                self.buffer.append(time.time(), await self._poll())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"MeshLink stats sample failed: {e}")
+            next_sample += self.interval
+            now = loop.time()
+            if next_sample < now:
+                # Skip the slots missed while the source stalled instead
+                # of polling back to back to catch up
+                missed = math.ceil((now - next_sample) / self.interval)
+                next_sample += missed * self.interval
+            await asyncio.sleep(max(0.0, next_sample - now))
+
+    def aggregates(
+        self, seconds: Optional[float] = None, fields: Optional[List[str]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Get aggregates for several fields over the same window."""
+        names = self.buffer.fields if fields is None else fields
+        return {name: self.buffer.aggregate(name, seconds) for name in names}
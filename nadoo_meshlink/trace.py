@@ -0,0 +1,360 @@
+"""NADOO MeshLink Bridge Trace Recording and Replay Module.
+
+A trace file starts with a fixed header followed by one record per
+command sent over the ZeroMQ bridge::
+
+    header:  magic "MLTR", version (u16), start time (f64, epoch seconds)
+    record:  offset (f64), latency (f32), request size (u32),
+             response size (u32), flags (u8), command length (u8),
+             command, [payload length (u32), payload]
+
+Offsets are seconds since the start of the trace. The request payload is
+only stored when the recorder was created with ``payloads=True``.
+"""
+import asyncio
+import json
+import struct
+import time
+import uuid
+from collections import defaultdict
+from typing import BinaryIO, Dict, Iterator, List, NamedTuple, Optional
+
+import zmq
+import zmq.asyncio
+
+from nadoo_meshlink.timeseries import percentile
+
+MAGIC = b"MLTR"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sHd")
+_RECORD = struct.Struct("<dfIIBB")
+_LENGTH = struct.Struct("<I")
+
+FLAG_OK = 0x01
+FLAG_PAYLOAD = 0x02
+
+# Commands that change per-client state in the backend rather than
+# exercising it; replaying them against a live backend leaves ghosts
+SESSION_COMMANDS = frozenset({"attach", "detach", "serve", "set_filter", "respond"})
+
+
+class TraceRecord(NamedTuple):
+    """A single command/response exchange read from a trace."""
+
+    offset: float
+    latency: float
+    request_size: int
+    response_size: int
+    ok: bool
+    command: str
+    payload: Optional[bytes]
+
+
+class TraceRecorder:
+    """Appends bridge exchanges to a binary trace file."""
+
+    def __init__(self, path: str, payloads: bool = True, buffer_size: int = 1 << 16):
+        """Initialize TraceRecorder.
+
+        Args:
+            path: Trace file to create
+            payloads: Store request payloads so the trace can be replayed
+            buffer_size: Write buffer size in bytes
+        """
+        self.path = path
+        self.payloads = payloads
+        self._file: Optional[BinaryIO] = open(path, "wb", buffering=buffer_size)
+        self._started = time.monotonic()
+        self._file.write(_HEADER.pack(MAGIC, VERSION, time.time()))
+        self.count = 0
+
+    def record(
+        self,
+        started: float,
+        latency: float,
+        command: str,
+        request: bytes,
+        response_size: int,
+        ok: bool,
+    ) -> None:
+        """Write one exchange; ``started`` is a time.monotonic() value."""
+        if self._file is None:
+            return
+        name = command.encode()[:255]
+        flags = (FLAG_OK if ok else 0) | (FLAG_PAYLOAD if self.payloads else 0)
+        self._file.write(
+            _RECORD.pack(
+                started - self._started,
+                latency,
+                len(request),
+                response_size,
+                flags,
+                len(name),
+            )
+        )
+        self._file.write(name)
+        if self.payloads:
+            self._file.write(_LENGTH.pack(len(request)))
+            self._file.write(request)
+        self.count += 1
+
+    def close(self) -> None:
+        """Flush and close the trace file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "TraceRecorder":
+        """Enter context manager."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Exit context manager."""
+        self.close()
+
+
+def read_trace(path: str) -> Iterator[TraceRecord]:
+    """Iterate over the records of a trace file.
+
+    Raises:
+        ValueError: If the file is not a MeshLink trace
+    """
+    with open(path, "rb") as trace:
+        header = trace.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise ValueError(f"{path} is not a MeshLink trace")
+        magic, version, _ = _HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a MeshLink trace (version {VERSION})")
+
+        while True:
+            fixed = trace.read(_RECORD.size)
+            if len(fixed) < _RECORD.size:
+                # A truncated last record means the recorder was interrupted
+                return
+            offset, latency, request_size, response_size, flags, name_length = (
+                _RECORD.unpack(fixed)
+            )
+            command = trace.read(name_length).decode()
+            payload = None
+            if flags & FLAG_PAYLOAD:
+                length = trace.read(_LENGTH.size)
+                if len(length) < _LENGTH.size:
+                    return
+                payload = trace.read(_LENGTH.unpack(length)[0])
+            yield TraceRecord(
+                offset,
+                latency,
+                request_size,
+                response_size,
+                bool(flags & FLAG_OK),
+                command,
+                payload,
+            )
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    """Get count, mean and percentiles of latencies in seconds."""
+    ordered = sorted(latencies)
+    return {
+        "count": len(ordered),
+        "mean": sum(ordered) / len(ordered) if ordered else 0.0,
+        "min": ordered[0] if ordered else 0.0,
+        "p50": percentile(ordered, 50),
+        "p90": percentile(ordered, 90),
+        "p99": percentile(ordered, 99),
+        "max": ordered[-1] if ordered else 0.0,
+    }
+
+
+class ReplayReport:
+    """Latency distributions measured while replaying a trace."""
+
+    def __init__(self):
+        """Initialize ReplayReport."""
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors = 0
+        self.timeouts = 0
+        self.skipped = 0
+        self.lag = 0.0
+        self.duration = 0.0
+
+    def add(self, command: str, latency: float, ok: bool) -> None:
+        """Record the outcome of one replayed command."""
+        self.latencies[command].append(latency)
+        if not ok:
+            self.errors += 1
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Get latency statistics per command and across all commands."""
+        result = {command: summarize(values) for command, values in self.latencies.items()}
+        result["all"] = summarize(
+            [value for values in self.latencies.values() for value in values]
+        )
+        return result
+
+
+class TraceReplayer:
+    """Replays a recorded trace against a MeshLink backend."""
+
+    def __init__(
+        self,
+        path: str,
+        endpoint: str = "tcp://localhost:5555",
+        concurrency: int = 1,
+        timeout: float = 5.0,
+        session_commands: bool = False,
+    ):
+        """Initialize TraceReplayer.
+
+        Every replayed command is sent under a client ID of its own, so
+        responses never reach the process that recorded the trace.
+
+        Args:
+            path: Trace file to replay
+            endpoint: ZeroMQ endpoint of the backend or a StubBackend
+            concurrency: Number of connections used for overlapping commands
+            timeout: Seconds to wait for each response
+            session_commands: Also replay SESSION_COMMANDS; the replay
+                client is detached afterwards to drop the state they add
+        """
+        self.path = path
+        self.endpoint = endpoint
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.session_commands = session_commands
+        self.client_id = uuid.uuid4().hex
+
+    def _connect(self, context: zmq.asyncio.Context) -> zmq.asyncio.Socket:
+        """Open a connection to the backend."""
+        socket = context.socket(zmq.REQ)
+        socket.connect(self.endpoint)
+        return socket
+
+    async def replay(self, speed: Optional[float] = 1.0) -> ReplayReport:
+        """Replay the trace and measure latencies.
+
+        Args:
+            speed: Time scale relative to the recording (2.0 is twice as
+                fast); None sends every command as soon as possible
+
+        Returns:
+            ReplayReport: Measured latency distributions
+        """
+        report = ReplayReport()
+        context = zmq.asyncio.Context()
+        sockets: asyncio.Queue = asyncio.Queue()
+        for _ in range(self.concurrency):
+            sockets.put_nowait(self._connect(context))
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        tasks = set()
+        try:
+            for record in read_trace(self.path):
+                if record.command in SESSION_COMMANDS and not self.session_commands:
+                    report.skipped += 1
+                    continue
+                if speed:
+                    delay = started + record.offset / speed - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    else:
+                        report.lag = max(report.lag, -delay)
+                socket = await sockets.get()
+                task = asyncio.create_task(
+                    self._send(context, socket, sockets, record, report)
+                )
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+            if self.session_commands:
+                await self._detach(context, sockets)
+        finally:
+            report.duration = loop.time() - started
+            # Every task hands its socket back when it ends, so once they
+            # are all done the queue holds every open socket
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            while not sockets.empty():
+                sockets.get_nowait().close(linger=0)
+            context.term()
+        return report
+
+    async def _send(
+        self,
+        context: zmq.asyncio.Context,
+        socket: zmq.asyncio.Socket,
+        sockets: asyncio.Queue,
+        record: TraceRecord,
+        report: ReplayReport,
+    ) -> None:
+        """Send one recorded command and wait for its response."""
+        message = {"command": record.command}
+        if record.payload is not None:
+            message = json.loads(record.payload)
+        message["client"] = self.client_id
+        request = json.dumps(message).encode()
+        try:
+            sent = time.monotonic()
+            await socket.send(request)
+            response = await asyncio.wait_for(socket.recv(), self.timeout)
+            latency = time.monotonic() - sent
+            ok = not json.loads(response).get("error")
+            report.add(record.command, latency, ok)
+        except asyncio.TimeoutError:
+            # The REQ socket still expects the lost reply, replace it
+            report.timeouts += 1
+            report.errors += 1
+            socket.close(linger=0)
+            socket = self._connect(context)
+        finally:
+            sockets.put_nowait(socket)
+
+    async def _detach(self, context: zmq.asyncio.Context, sockets: asyncio.Queue) -> None:
+        """Drop the servers, filters and lease replayed for the replay client."""
+        socket = await sockets.get()
+        try:
+            await socket.send(
+                json.dumps({"command": "detach", "client": self.client_id}).encode()
+            )
+            await asyncio.wait_for(socket.recv(), self.timeout)
+        except asyncio.TimeoutError:
+            socket.close(linger=0)
+            socket = self._connect(context)
+        finally:
+            sockets.put_nowait(socket)
+
+
+class StubBackend:
+    """Local stand-in for the Go service that acknowledges every command."""
+
+    def __init__(self, endpoint: str = "tcp://127.0.0.1:5555", latency: float = 0.0):
+        """Initialize StubBackend.
+
+        Args:
+            endpoint: ZeroMQ endpoint to bind
+            latency: Simulated processing time per command in seconds
+        """
+        self.endpoint = endpoint
+        self.latency = latency
+        self.handled = 0
+
+    async def serve(self) -> None:
+        """Answer commands until cancelled."""
+        context = zmq.asyncio.Context()
+        socket = context.socket(zmq.REP)
+        socket.bind(self.endpoint)
+        try:
+            while True:
+                await socket.recv()
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                await socket.send(b'{"success": true}')
+                self.handled += 1
+        finally:
+            socket.close(linger=0)
+            context.term()